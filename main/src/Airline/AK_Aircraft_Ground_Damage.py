@@ -1,14 +1,23 @@
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime, timedelta
 import random
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from columnar_sink import ColumnarSink
+from table_writer import write_csv
+from scale_factor import scaled
 
 # Set random seed for reproducibility
 np.random.seed(42)
 
 # Generate date range
 start_date = datetime(2023, 1, 1)
-end_date = datetime(2025, 4, 1)
+# Days of history scale with demo_scale_factor (SF1 runs through 2025-04-01)
+end_date = start_date + timedelta(days=scaled((datetime(2025, 4, 1) - start_date).days))
 date_range = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
 
 # Define dimensions
@@ -55,8 +64,31 @@ phases = ['Arrival', 'Departure', 'Towing', 'Fueling', 'Baggage Loading', 'Cater
 damage_types = ['Vehicle Collision', 'Jet Bridge Contact', 'Ground Equipment Impact', 'Loading Error', 'Pushback Incident', 'Towing Mishap', 'Weather-Related']
 damage_severities = ['Minor', 'Moderate', 'Severe']
 
-# Create empty list to store records
-data = []
+AGD_SCHEMA = pa.schema([
+    ('date', pa.string()),
+    ('airport_code', pa.string()),
+    ('airport_name', pa.string()),
+    ('airport_region', pa.string()),
+    ('aircraft_type', pa.string()),
+    ('aircraft_category', pa.string()),
+    ('weather_condition', pa.string()),
+    ('shift', pa.string()),
+    ('handling_company', pa.string()),
+    ('departures', pa.int64()),
+    ('incidents', pa.int64()),
+    ('agd_rate', pa.float64()),
+    ('phase_of_operation', pa.string()),
+    ('damage_type', pa.string()),
+    ('damage_severity', pa.string()),
+    ('repair_cost', pa.float64()),
+    ('delay_minutes', pa.int64()),
+    ('record_type', pa.string()),
+    ('incident_id', pa.string()),
+    ('outlier_event', pa.string())
+])
+
+# Sink to store records
+data = ColumnarSink(AGD_SCHEMA)
 
 # Base departure counts by airport size (daily)
 airport_sizes = {
@@ -107,6 +139,30 @@ handler_factors = {
     'UniGround': 0.8
 }
 
+# One-off incident spikes for certain airports to create outlier events;
+# applied while generating so no rows have to be patched or appended afterwards
+outlier_events = [
+    {'date': '2023-07-15', 'airport': 'ORD', 'factor': 3.0, 'reason': 'Severe thunderstorm'},
+    {'date': '2023-12-23', 'airport': 'DEN', 'factor': 2.5, 'reason': 'Major snowstorm'},
+    {'date': '2024-03-10', 'airport': 'ATL', 'factor': 2.0, 'reason': 'Ground staff strike'},
+    {'date': '2024-08-05', 'airport': 'MIA', 'factor': 2.5, 'reason': 'Hurricane warning'},
+    {'date': '2024-11-28', 'airport': 'LGA', 'factor': 1.8, 'reason': 'Thanksgiving travel surge'}
+]
+outlier_lookup = {(event['date'], event['airport']): event for event in outlier_events}
+
+# Estimate costs based on severity
+def incident_cost(severity):
+    if severity == 'Minor':
+        repair_cost = np.random.uniform(5000, 20000)
+        delay_minutes = np.random.randint(0, 60)
+    elif severity == 'Moderate':
+        repair_cost = np.random.uniform(20000, 100000)
+        delay_minutes = np.random.randint(60, 180)
+    else:  # Severe
+        repair_cost = np.random.uniform(100000, 500000)
+        delay_minutes = np.random.randint(180, 720)
+    return repair_cost, delay_minutes
+
 # Generate departureS data
 print("Generating base departure data...")
 row_count = 0
@@ -207,6 +263,13 @@ for date in date_range:
                     # Actual incidents (Poisson distribution around the expected rate)
                     incidents = np.random.poisson(expected_incidents)
                     
+                    # Outlier events multiply the incidents for their date and airport
+                    outlier = outlier_lookup.get((date.strftime('%Y-%m-%d'), airport_code))
+                    additional = 0
+                    if outlier:
+                        additional = max(int(incidents * outlier['factor']) - incidents, 0)
+                    incidents += additional
+                    
                     # Add a record even if no incidents
                     agd_rate = (incidents / shift_departures) * 1000 if shift_departures > 0 else 0
                     
@@ -225,12 +288,12 @@ for date in date_range:
                         'agd_rate': agd_rate
                     }
                     
-                    data.append(record)
+                    data.append_row(record)
                     row_count += 1
                     
                     # If we have incidents, create detailed incident records
                     if incidents > 0:
-                        for i in range(incidents):
+                        for i in range(incidents - additional):
                             phase = np.random.choice(phases)
                             damage_type = np.random.choice(damage_types)
                             
@@ -241,17 +304,7 @@ for date in date_range:
                                 damage_type = 'Ground Equipment Impact'
                                 
                             severity = np.random.choice(damage_severities, p=[0.6, 0.3, 0.1])
-                            
-                            # Estimate costs based on severity
-                            if severity == 'Minor':
-                                repair_cost = np.random.uniform(5000, 20000)
-                                delay_minutes = np.random.randint(0, 60)
-                            elif severity == 'Moderate':
-                                repair_cost = np.random.uniform(20000, 100000)
-                                delay_minutes = np.random.randint(60, 180)
-                            else:  # Severe
-                                repair_cost = np.random.uniform(100000, 500000)
-                                delay_minutes = np.random.randint(180, 720)
+                            repair_cost, delay_minutes = incident_cost(severity)
                                 
                             incident_record = record.copy()
                             incident_record['phase_of_operation'] = phase
@@ -264,100 +317,51 @@ for date in date_range:
                             incident_record['record_type'] = 'incident'
                             incident_record['incident_id'] = f"INC-{date.strftime('%Y%m%d')}-{airport_code}-{i+1}"
                             
-                            data.append(incident_record)
+                            data.append_row(incident_record)
                             row_count += 1
-
-print(f"Generated {row_count} records")
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Add one-off incident spikes for certain airports to create outlier events
-outlier_events = [
-    {'date': '2023-07-15', 'airport': 'ORD', 'factor': 3.0, 'reason': 'Severe thunderstorm'},
-    {'date': '2023-12-23', 'airport': 'DEN', 'factor': 2.5, 'reason': 'Major snowstorm'},
-    {'date': '2024-03-10', 'airport': 'ATL', 'factor': 2.0, 'reason': 'Ground staff strike'},
-    {'date': '2024-08-05', 'airport': 'MIA', 'factor': 2.5, 'reason': 'Hurricane warning'},
-    {'date': '2024-11-28', 'airport': 'LGA', 'factor': 1.8, 'reason': 'Thanksgiving travel surge'}
-]
-
-# Function to inject outliers
-def inject_outliers(df, outlier_events):
-    for event in outlier_events:
-        # Find records for this date and airport
-        mask = (df['date'] == event['date']) & (df['airport_code'] == event['airport'])
-        
-        # Get indices of records to modify
-        indices = df[mask].index
-        
-        # Multiply incidents by the factor
-        for idx in indices:
-            if 'incidents' in df.loc[idx]:
-                old_incidents = df.loc[idx, 'incidents']
-                new_incidents = int(old_incidents * event['factor'])
-                additional = new_incidents - old_incidents
-                
-                if additional > 0:
-                    df.loc[idx, 'incidents'] = new_incidents
-                    
-                    # Recalculate AGD rate
-                    departures = df.loc[idx, 'departures']
-                    if departures > 0:
-                        df.loc[idx, 'agd_rate'] = (new_incidents / departures) * 1000
-                    
-                    # Add additional incident records
-                    base_record = df.loc[idx].to_dict()
-                    if 'record_type' not in base_record or base_record['record_type'] != 'incident':
+                        
+                        # Additional incident records for outlier events
                         for i in range(additional):
                             phase = np.random.choice(phases)
                             damage_type = np.random.choice(damage_types)
                             severity = np.random.choice(damage_severities, p=[0.4, 0.4, 0.2])  # Higher severity for outlier events
+                            repair_cost, delay_minutes = incident_cost(severity)
                             
-                            if severity == 'Minor':
-                                repair_cost = np.random.uniform(5000, 20000)
-                                delay_minutes = np.random.randint(0, 60)
-                            elif severity == 'Moderate':
-                                repair_cost = np.random.uniform(20000, 100000)
-                                delay_minutes = np.random.randint(60, 180)
-                            else:  # Severe
-                                repair_cost = np.random.uniform(100000, 500000)
-                                delay_minutes = np.random.randint(180, 720)
-                                
-                            incident_record = base_record.copy()
+                            incident_record = record.copy()
                             incident_record['phase_of_operation'] = phase
                             incident_record['damage_type'] = damage_type
                             incident_record['damage_severity'] = severity
                             incident_record['repair_cost'] = round(repair_cost, 2)
                             incident_record['delay_minutes'] = delay_minutes
                             incident_record['record_type'] = 'incident'
-                            incident_record['incident_id'] = f"INC-{event['date'].replace('-', '')}-{event['airport']}-OUTLIER-{i+1}"
-                            incident_record['outlier_event'] = event['reason']
+                            incident_record['incident_id'] = f"INC-{outlier['date'].replace('-', '')}-{outlier['airport']}-OUTLIER-{i+1}"
+                            incident_record['outlier_event'] = outlier['reason']
                             
-                            # Append to DataFrame
-                            df = pd.concat([df, pd.DataFrame([incident_record])], ignore_index=True)
-    
-    return df
+                            data.append_row(incident_record)
+                            row_count += 1
+
+print(f"Generated {row_count} records")
 
-# Inject outliers
-df = inject_outliers(df, outlier_events)
+table = data.to_table()
 
 # Save the dataset
-df.to_csv('aircraft_ground_damage_data.csv', index=False)
-print(f"Dataset saved with {len(df)} rows")
+write_csv(table, os.path.join(os.getenv('demo_output_dir', '.'), 'aircraft_ground_damage_data.csv'))
+print(f"Dataset saved with {table.num_rows} rows")
 
 # Print sample
 print("\nSample data:")
-print(df.sample(5))
+print(table.take(np.random.choice(table.num_rows, 5, replace=False)).to_pandas())
 
 # Summary statistics
 print("\nAGD Rate by Year:")
-df['year'] = pd.to_datetime(df['date']).dt.year
-yearly_agd = df.groupby('year')['agd_rate'].mean()
-print(yearly_agd)
+yearly_agd = (table.append_column('year', pc.utf8_slice_codeunits(table['date'], 0, 4))
+              .group_by('year').aggregate([('agd_rate', 'mean')]).sort_by('year'))
+for year, agd_rate in zip(yearly_agd['year'].to_pylist(), yearly_agd['agd_rate_mean'].to_pylist()):
+    print(year, agd_rate)
 
 print("\nRow counts:")
-print(df.shape[0], "total rows")
-print(df[df['incidents'] > 0].shape[0], "rows with incidents")
+print(table.num_rows, "total rows")
+print(pc.sum(pc.greater(table['incidents'], 0)).as_py(), "rows with incidents")
 
 # Example SQL queries you might use to build stories
 print("\nSQL query examples for your demo:")
@@ -1,7 +1,12 @@
 import itertools
 import random
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled
+
 # Define the dimension values
 route_names = [
     "KABQ - KPDX",
@@ -38,8 +43,9 @@ for month in months:
     month_str = month.strftime("%Y-%m")
     # For each combination of route, aircraft type, and flight shift
     for route, aircraft, shift in itertools.product(route_names, aircraft_types, flight_shifts):
-        # Scheduled flights between 20 and 100
-        total_scheduled = random.randint(20, 100)
+        # Scheduled flights between 20 and 100 at SF1; one row per route/aircraft/shift/month,
+        # so the scale factor sizes the flight volumes rather than the row count
+        total_scheduled = random.randint(scaled(20), scaled(100))
         # Ensure completed flights are at least 80% of total scheduled for realism
         lower_bound = max(1, int(total_scheduled * 0.8))
         completed = random.randint(lower_bound, total_scheduled)
@@ -1,7 +1,12 @@
 import itertools
 import random
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled
+
 def random_partition(total, parts):
     """
     Randomly partition the integer 'total' into 'parts' integers
@@ -48,8 +53,9 @@ sequence_number = 1  # Initialize sequence number
 
 # For each month, generate the records
 for month in months:
-    # Set a monthly target total signups between 2000 and 5000
-    monthly_target = random.randint(2000, 5000)
+    # Set a monthly target total signups between 2000 and 5000 at SF1 (scaled, since the row count
+    # is fixed by the combinations); every combination gets at least one signup
+    monthly_target = random.randint(scaled(2000, num_combos), scaled(5000, num_combos))
     # Distribute the monthly target among the 400 dimension combinations
     partition = random_partition(monthly_target, num_combos)
     
@@ -8,13 +8,17 @@ import pyarrow as pa
 import pyarrow.parquet as pq
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled, NUM_CUSTOMERS, NUM_HOTELS, NUM_RESERVATIONS
+from id_allocator import render_keys
+
 # Set random seed for reproducibility
 np.random.seed(42)
 fake = Faker()
 Faker.seed(42)
 
 # Specify the base directory
-BASE_DIR = "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Call_Center/"
+BASE_DIR = os.getenv("demo_output_dir", "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Call_Center/")
 print(f"Using base directory: {BASE_DIR}")
 sys.stdout.flush()
 
@@ -36,15 +40,16 @@ for i in range(1, num_agents + 1):
 agents = pd.DataFrame(agent_data)
 
 # Generate Call data
-num_calls = 500000  # Adjust as needed
+num_calls = scaled(500000)
 start_date = datetime(2023, 1, 1)
 end_date = datetime(2023, 12, 31)
 
 calls = pd.DataFrame({
     'CallID': range(1, num_calls + 1),
-    'CustomerID': [f'Customer_{np.random.randint(1, 150001)}' for _ in range(num_calls)],
-    'PropertyID': [f'Property_Code_{np.random.randint(1, 101)}' for _ in range(num_calls)],
-    'ReservationID': np.random.choice([np.nan] + list(range(1, 1900001)), num_calls, p=[0.3] + [0.7/1900000]*1900000),
+    'CustomerID': render_keys(np.random.randint(1, NUM_CUSTOMERS + 1, num_calls), 'Customer_'),
+    'PropertyID': render_keys(np.random.randint(1, NUM_HOTELS + 1, num_calls), 'Property_Code_'),
+    # 30% of calls have no reservation, the rest reference one uniformly
+    'ReservationID': np.where(np.random.random(num_calls) < 0.3, np.nan, np.random.randint(1, NUM_RESERVATIONS + 1, num_calls)),
     'CallStartTime': [start_date + timedelta(seconds=np.random.randint(0, int((end_date - start_date).total_seconds()))) for _ in range(num_calls)],
     'CallType': np.random.choice(['Inquiry', 'Complaint', 'Reservation', 'Other'], num_calls),
     'WaitTime': np.random.randint(0, 600, num_calls),  # Wait time in seconds (0 to 10 minutes)
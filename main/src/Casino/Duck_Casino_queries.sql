@@ -45,36 +45,32 @@ GROUP BY
 ORDER BY 
     Hour;
 
--- Shift transactions around for seasonality:
-WITH transactions_to_move AS (
-    SELECT SessionID, Timestamp
-    FROM hotel_reservations.main.F_Slots_Transactions
-    WHERE EXTRACT(MONTH FROM Timestamp) = 4  -- April - this is the month we are taking transactions from
-    ORDER BY RANDOM()  -- Randomize the selection
-    LIMIT 30000
-)
-UPDATE hotel_reservations.main.F_Slots_Transactions
-SET Timestamp = Timestamp - INTERVAL '3 months'
-WHERE SessionID IN (SELECT SessionID FROM transactions_to_move);
+-- Seasonality (the April -> January shift that used to be applied here) is generated by
+-- Slot_Trans.py: see MONTH_WEIGHTS, WEEKDAY_WEIGHTS and HOUR_WEIGHTS. No rewrite of the loaded
+-- transactions is needed.
 
-/* CREATE VIEW FOR SESSIONS SUMMARY*/
+/* SESSIONS SUMMARY*/
 
--- Create the materialized view
-CREATE VIEW MV_Slots_Sessions AS
-SELECT 
-    SessionID,
-    MachineID,
-    CustomerID,
-    MIN(Timestamp) AS StartTime,
-    MAX(Timestamp) AS EndTime,
-    SUM(BetAmount) AS TotalBets,
-    SUM(PayoutAmount) AS TotalPayouts,
-    SUM(BetAmount) - SUM(PayoutAmount) AS Revenue,
-    COUNT(*) AS TransactionCount
-FROM 
-    F_Slots_Transactions
-GROUP BY 
-    SessionID, MachineID, CustomerID;
+-- MV_Slots_Sessions is a table maintained by Common/materialized_view.py, which stores this
+-- query's result and on each refresh recomputes only the sessions with transactions loaded since
+-- the previous refresh, i.e. with a LoadID above the one it recorded in MV_Refresh_State:
+--     python materialized_view.py MV_Slots_Sessions [--full] [--check]
+-- It replaces a CREATE VIEW of the same query, which re-aggregated F_Slots_Transactions on every read.
+--
+-- SELECT
+--     SessionID,
+--     MachineID,
+--     CustomerID,
+--     MIN(Timestamp) AS StartTime,
+--     MAX(Timestamp) AS EndTime,
+--     SUM(BetAmount) AS TotalBets,
+--     SUM(PayoutAmount) AS TotalPayouts,
+--     SUM(BetAmount) - SUM(PayoutAmount) AS Revenue,
+--     COUNT(*) AS TransactionCount
+-- FROM
+--     F_Slots_Transactions
+-- GROUP BY
+--     SessionID, MachineID, CustomerID;
 
 /*
 --Volume
@@ -1,11 +1,20 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 import random
 import time
 import gc
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from id_allocator import render_keys
+from table_writer import TableWriter
+from scale_factor import scaled, NUM_CUSTOMERS
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -13,13 +22,43 @@ np.random.seed(42)
 # Constants
 START_DATE = datetime(2023, 10, 1)
 END_DATE = START_DATE + timedelta(days=13*30)  # Approximately 13 months
-TOTAL_MACHINES = 100
+TOTAL_MACHINES = scaled(100)
 CARDED_PLAY_PERCENTAGE = 0.7
 MIN_BET_RANGE = (1, 20)
 MAX_BET_RANGE = (10, 500)
 PAYOUT_RANGE = (0.88, 0.92)
-AVG_SESSIONS_PER_DAY = 6000
-TOTAL_CUSTOMERS = 160000
+AVG_SESSIONS_PER_DAY = scaled(6000)
+TOTAL_CUSTOMERS = NUM_CUSTOMERS
+OUTPUT_DIR = os.getenv('demo_output_dir', '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Casino')
+
+# Seasonality profile: session volume by month and weekday (multipliers on AVG_SESSIONS_PER_DAY) and
+# the share of a day's sessions starting in each hour. January is the busiest month, followed by May
+# and December; April and June are the slowest (January/April include the shift of April play into
+# January that Duck_Casino_queries.sql used to apply after loading).
+MONTH_WEIGHTS = {1: 1.07, 4: 0.96, 5: 1.03, 6: 0.97, 12: 1.03}  # other months 1.0
+WEEKDAY_WEIGHTS = np.array([0.90, 0.85, 0.90, 0.95, 1.15, 1.25, 1.00])  # Monday..Sunday, averaging 1.0
+HOUR_WEIGHTS = np.array([0.90, 0.70, 0.50, 0.35, 0.25, 0.20, 0.25, 0.35, 0.50, 0.60, 0.70, 0.80,
+                         0.90, 0.95, 1.00, 1.05, 1.15, 1.30, 1.50, 1.60, 1.60, 1.50, 1.30, 1.10])
+HOUR_PROBABILITIES = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+
+SESSION_SCHEMA = pa.schema([
+    ('SessionID', pa.string()),
+    ('MachineID', pa.string()),
+    ('StartTime', pa.timestamp('us')),
+    ('EndTime', pa.timestamp('us')),
+    ('TotalBets', pa.float64()),
+    ('TotalPayouts', pa.float64()),
+    ('CustomerID', pa.string())
+])
+
+TRANSACTION_SCHEMA = pa.schema([
+    ('TransactionID', pa.string()),
+    ('SessionID', pa.string()),
+    ('Timestamp', pa.timestamp('us')),
+    ('BetAmount', pa.float64()),
+    ('PayoutAmount', pa.float64()),
+    ('LoadID', pa.int32())
+])
 
 # Real slot machine manufacturers and models
 MACHINES = [
@@ -72,106 +111,196 @@ def generate_machines(num_machines):
     return pd.DataFrame(machines)
 
 print("start generate_sessions")
+# Session length multiplier by hour of day, looked up per session start hour
+def hour_duration_factor(hour):
+    if 17 <= hour < 2 or hour == 0:
+        return 1.2  # Busy hours
+    elif 7 <= hour < 11:
+        return 0.8  # Light hours
+    return 1.0  # Average hours
+
+HOUR_DURATION_FACTORS = np.array([hour_duration_factor(hour) for hour in range(24)])
+
+# Sessions one day at a time: yields (date, record batch of that day's sessions)
 def generate_sessions(start_date, end_date, machines_df):
     date_range = pd.date_range(start_date, end_date, freq='D')
-    sessions = []
-    
+    num_sessions_so_far = 0
+    machine_ids = machines_df['MachineID'].to_numpy()
+    min_bets = machines_df['MinBet'].to_numpy()
+    max_bets = machines_df['MaxBet'].to_numpy()
+    payout_percentages = machines_df['PayoutPercentage'].to_numpy()
+
+    # A day's sessions are drawn as arrays, one call per field
     for date in date_range:
-        # Adjust number of sessions based on month
-        month = date.month
-        if month == 1:
-            adj_factor = 1.06  # January: 6% above average
-        elif month in [5, 12]:
-            adj_factor = 1.03  # May and December: 3% above average
-        elif month in [4, 6]:
-            adj_factor = 0.97  # April and June: 3% below average
-        else:
-            adj_factor = 1.0
-
-        num_sessions = int(np.random.normal(AVG_SESSIONS_PER_DAY, AVG_SESSIONS_PER_DAY * 0.1) * adj_factor)
-        
-        for _ in range(num_sessions):
-            machine = machines_df.sample(1).iloc[0]
-            start_time = date + pd.Timedelta(seconds=random.randint(0, 86399))
-            
-            # Adjust session frequency based on time of day
-            hour = start_time.hour
-            if 17 <= hour < 2 or hour == 0:
-                duration_factor = 1.2  # Busy hours
-            elif 7 <= hour < 11:
-                duration_factor = 0.8  # Light hours
-            else:
-                duration_factor = 1.0  # Average hours
-            
-            duration = timedelta(minutes=random.randint(5, 60) * duration_factor)
-            end_time = start_time + duration
-            
-            total_bets = round(random.uniform(machine['MinBet'], machine['MaxBet']) * random.randint(10, 100), 2)
-            total_payouts = round(total_bets * machine['PayoutPercentage'] * random.uniform(0.9, 1.1), 2)
-            
-            session = {
-                'SessionID': f'SESSION_{len(sessions) + 1}',
-                'MachineID': machine['MachineID'],
-                'StartTime': start_time,
-                'EndTime': end_time,
-                'TotalBets': total_bets,
-                'TotalPayouts': total_payouts
-            }
-            
-            if random.random() < CARDED_PLAY_PERCENTAGE:
-                session['CustomerID'] = f'Customer_{random.randint(1, TOTAL_CUSTOMERS)}'
-            
-            sessions.append(session)
-    
-    return pd.DataFrame(sessions)
+        # Number of sessions from the month and weekday of the seasonality profile
+        adj_factor = MONTH_WEIGHTS.get(date.month, 1.0) * WEEKDAY_WEIGHTS[date.weekday()]
+
+        num_sessions = max(0, int(np.random.normal(AVG_SESSIONS_PER_DAY, AVG_SESSIONS_PER_DAY * 0.1) * adj_factor))
+
+        machine_index = np.random.randint(0, len(machines_df), num_sessions)
+        # Start hour from the hourly profile, then a uniform second within the hour
+        start_hour = np.random.choice(24, num_sessions, p=HOUR_PROBABILITIES)
+        start_seconds = start_hour * 3600 + np.random.randint(0, 3600, num_sessions)
+        start_time = np.datetime64(date.date(), 'us') + start_seconds.astype('timedelta64[s]')
+
+        # Adjust session length based on time of day
+        duration_minutes = np.random.randint(5, 61, num_sessions) * HOUR_DURATION_FACTORS[start_seconds // 3600]
+        end_time = start_time + np.round(duration_minutes * 60_000_000).astype('timedelta64[us]')
+
+        total_bets = np.round(np.random.uniform(min_bets[machine_index], max_bets[machine_index]) *
+                              np.random.randint(10, 101, num_sessions), 2)
+        total_payouts = np.round(total_bets * payout_percentages[machine_index] *
+                                 np.random.uniform(0.9, 1.1, num_sessions), 2)
+
+        carded = np.random.random(num_sessions) < CARDED_PLAY_PERCENTAGE
+        customer_ids = render_keys(np.random.randint(1, TOTAL_CUSTOMERS + 1, num_sessions), 'Customer_')
+
+        yield date, pa.RecordBatch.from_pydict({
+            'SessionID': render_keys(np.arange(num_sessions_so_far + 1, num_sessions_so_far + num_sessions + 1), 'SESSION_'),
+            'MachineID': machine_ids[machine_index],
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'TotalBets': total_bets,
+            'TotalPayouts': total_payouts,
+            'CustomerID': pa.array(customer_ids, mask=~carded)
+        }, schema=SESSION_SCHEMA)
+        num_sessions_so_far += num_sessions
 
 print("start generate_transactions")
 
-def generate_transactions(sessions_df):
-    transactions = []
-    for _, session in sessions_df.iterrows():
-        num_transactions = random.randint(5, 50)
-        for _ in range(num_transactions):
-            bet_amount = round(session['TotalBets'] / num_transactions, 2)
-            payout_amount = round(random.uniform(0, bet_amount * 2), 2)
-            transaction = {
-                'TransactionID': f'TRANS_{len(transactions) + 1}',
-                'SessionID': session['SessionID'],
-                'Timestamp': session['StartTime'] + pd.Timedelta(seconds=random.randint(0, (session['EndTime'] - session['StartTime']).seconds)),
-                'BetAmount': bet_amount,
-                'PayoutAmount': payout_amount
-            }
-            transactions.append(transaction)
-    return pd.DataFrame(transactions)
-
-print("start generate_daily_revenue")
-
-def generate_daily_revenue(sessions_df):
-    daily_revenue = sessions_df.groupby(sessions_df['StartTime'].dt.date).agg({
-        'TotalBets': 'sum',
-        'TotalPayouts': 'sum'
-    }).reset_index()
-    daily_revenue['NetRevenue'] = daily_revenue['TotalBets'] - daily_revenue['TotalPayouts']
-    daily_revenue = daily_revenue.rename(columns={'StartTime': 'Date'})
-    return daily_revenue
+# The transactions of a batch of sessions (num_transactions for each), numbered from
+# first_transaction_id: the session columns are repeated once per transaction and the
+# within-session draws are made in bulk, as arrays. load_id stamps the batch for the incremental
+# refresh of MV_Slots_Sessions (Common/materialized_view.py), which picks up rows by LoadID.
+def generate_transactions(batch, num_transactions, first_transaction_id, load_id):
+    session_index = np.repeat(np.arange(batch.num_rows), num_transactions)
+    count = num_transactions[session_index]
+
+    start_time = batch.column('StartTime').to_numpy()[session_index]
+    session_seconds = (batch.column('EndTime').to_numpy() - batch.column('StartTime').to_numpy()) // np.timedelta64(1, 's')
+    offset_seconds = np.random.randint(0, session_seconds[session_index] + 1)
+
+    bet_amount = np.round(batch.column('TotalBets').to_numpy()[session_index] / count, 2)
+    payout_amount = np.round(np.random.uniform(0, bet_amount * 2), 2)
+
+    return pa.RecordBatch.from_pydict({
+        'TransactionID': render_keys(np.arange(first_transaction_id, first_transaction_id + len(session_index)), 'TRANS_'),
+        'SessionID': batch.column('SessionID').take(pa.array(session_index)),
+        'Timestamp': start_time + offset_seconds.astype('timedelta64[s]'),
+        'BetAmount': bet_amount,
+        'PayoutAmount': payout_amount,
+        'LoadID': np.full(len(session_index), load_id, dtype=np.int32)
+    }, schema=TRANSACTION_SCHEMA)
+
+# Per-session totals over a batch of sessions' transactions, the rows MV_Slots_Sessions aggregates from
+# F_Slots_Transactions. A session's transactions are contiguous, so each total is one reduceat.
+SESSION_SUMMARY_SCHEMA = pa.schema([
+    ('SessionID', pa.string()),
+    ('MachineID', pa.string()),
+    ('CustomerID', pa.string()),
+    ('StartTime', pa.timestamp('us')),
+    ('EndTime', pa.timestamp('us')),
+    ('TotalBets', pa.float64()),
+    ('TotalPayouts', pa.float64()),
+    ('Revenue', pa.float64()),
+    ('TransactionCount', pa.int64())
+])
+
+def summarise_sessions(sessions, transactions, num_transactions):
+    if len(num_transactions) == 0:
+        # A day without sessions (small scale factors); reduceat needs at least one row
+        return pa.RecordBatch.from_pylist([], schema=SESSION_SUMMARY_SCHEMA)
+    starts = np.concatenate([[0], np.cumsum(num_transactions)[:-1]])
+    timestamps = transactions.column('Timestamp').to_numpy().view(np.int64)
+    total_bets = np.add.reduceat(transactions.column('BetAmount').to_numpy(), starts)
+    total_payouts = np.add.reduceat(transactions.column('PayoutAmount').to_numpy(), starts)
+    return pa.RecordBatch.from_pydict({
+        'SessionID': sessions.column('SessionID'),
+        'MachineID': sessions.column('MachineID'),
+        'CustomerID': sessions.column('CustomerID'),
+        'StartTime': np.minimum.reduceat(timestamps, starts).view('datetime64[us]'),
+        'EndTime': np.maximum.reduceat(timestamps, starts).view('datetime64[us]'),
+        'TotalBets': total_bets,
+        'TotalPayouts': total_payouts,
+        'Revenue': total_bets - total_payouts,
+        'TransactionCount': num_transactions
+    }, schema=SESSION_SUMMARY_SCHEMA)
+
+# Running totals per (day, machine), filled in as each day's sessions are generated. The arrays are
+# sized once (days x machines), so the daily tables come out without another pass over the sessions.
+class RevenueAccumulator:
+    def __init__(self, dates, machine_ids):
+        self.dates = dates
+        self.machine_ids = pa.array(machine_ids)
+        shape = (len(dates), len(machine_ids))
+        self.sessions = np.zeros(shape, dtype=np.int64)
+        self.transactions = np.zeros(shape, dtype=np.int64)
+        self.total_bets = np.zeros(shape)
+        self.total_payouts = np.zeros(shape)
+
+    def add_day(self, day, sessions, num_transactions):
+        machine_index = pc.index_in(sessions.column('MachineID'), value_set=self.machine_ids).to_numpy()
+        num_machines = len(self.machine_ids)
+        self.sessions[day] += np.bincount(machine_index, minlength=num_machines)
+        self.transactions[day] += np.bincount(machine_index, weights=num_transactions, minlength=num_machines).astype(np.int64)
+        self.total_bets[day] += np.bincount(machine_index, weights=sessions.column('TotalBets').to_numpy(), minlength=num_machines)
+        self.total_payouts[day] += np.bincount(machine_index, weights=sessions.column('TotalPayouts').to_numpy(), minlength=num_machines)
+
+    def daily_machine_revenue(self):
+        num_days, num_machines = self.sessions.shape
+        return pa.table({
+            'Date': pa.array(np.repeat(np.array(self.dates, dtype='datetime64[D]'), num_machines), pa.date32()),
+            'MachineID': pa.concat_arrays([self.machine_ids] * num_days),
+            'Sessions': self.sessions.ravel(),
+            'Transactions': self.transactions.ravel(),
+            'TotalBets': self.total_bets.ravel(),
+            'TotalPayouts': self.total_payouts.ravel(),
+            'NetRevenue': (self.total_bets - self.total_payouts).ravel()
+        })
+
+    def daily_revenue(self):
+        total_bets = self.total_bets.sum(axis=1)
+        total_payouts = self.total_payouts.sum(axis=1)
+        return pa.table({
+            'Date': pa.array(np.array(self.dates, dtype='datetime64[D]'), pa.date32()),
+            'TotalBets': total_bets,
+            'TotalPayouts': total_payouts,
+            'NetRevenue': total_bets - total_payouts
+        })
+
+parser = argparse.ArgumentParser(description='Generate the casino slot machine tables.')
+parser.add_argument('--partition-by-month', action='store_true',
+                    help='write sessions and transactions as month=YYYY-MM partitioned datasets')
+args = parser.parse_args()
+
+# Sessions and transactions of one day go to table_name (or its partition for the day's month)
+def output_name(table_name, date):
+    return f"{table_name}/month={date:%Y-%m}/part-0" if args.partition_by_month else table_name
 
 # Generate data
 print("let's buckle up")
 print("generate machines - should be fast")
 machines_df = generate_machines(TOTAL_MACHINES)
-print("generate sessions - should be the longest")
-sessions_df = generate_sessions(START_DATE, END_DATE, machines_df)
-print("generate transactions - actually this should be the longest")
-transactions_df = generate_transactions(sessions_df)
-print("generate daily revenue - should be somewhat quick")
-daily_revenue_df = generate_daily_revenue(sessions_df)
-
-print("start write to parquet files")
-
-# Save to parquet files
-pq.write_table(pa.Table.from_pandas(machines_df), '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Casino/machines.parquet')
-pq.write_table(pa.Table.from_pandas(sessions_df), '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Casino/sessions.parquet')
-pq.write_table(pa.Table.from_pandas(transactions_df), '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Casino/transactions.parquet')
-pq.write_table(pa.Table.from_pandas(daily_revenue_df), '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Casino/daily_revenue.parquet')
-
-print("Data generation complete. Parquet files have been created.")
\ No newline at end of file
+pq.write_table(pa.Table.from_pandas(machines_df), os.path.join(OUTPUT_DIR, 'machines.parquet'))
+
+# Sessions and transactions are generated a day at a time and each day is appended to the Parquet
+# files as a row group, so memory holds one day of data however long the date range is. The session
+# summaries and daily/machine totals are accumulated from the same day's data as it goes.
+print("generate sessions and transactions, one day at a time")
+revenue = RevenueAccumulator(pd.date_range(START_DATE, END_DATE, freq='D'), machines_df['MachineID'].tolist())
+num_transactions_so_far = 0
+with TableWriter(OUTPUT_DIR, 'parquet') as writer:
+    for day, (date, day_sessions) in enumerate(generate_sessions(START_DATE, END_DATE, machines_df)):
+        num_transactions = np.random.randint(5, 51, day_sessions.num_rows)
+        # Each day is one load: day 1 has LoadID 1, and appending a later day raises it
+        day_transactions = generate_transactions(day_sessions, num_transactions, num_transactions_so_far + 1, day + 1)
+        num_transactions_so_far += day_transactions.num_rows
+        writer.write(output_name('sessions', date), day_sessions)
+        writer.write(output_name('transactions', date), day_transactions)
+        writer.write(output_name('session_summary', date), summarise_sessions(day_sessions, day_transactions, num_transactions))
+        revenue.add_day(day, day_sessions, num_transactions)
+
+    writer.write('daily_machine_revenue', revenue.daily_machine_revenue())
+    writer.write('daily_revenue', revenue.daily_revenue())
+
+print("Data generation complete. Parquet files have been created.")
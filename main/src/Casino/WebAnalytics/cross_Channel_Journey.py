@@ -5,16 +5,21 @@ from datetime import datetime, timedelta
 import random
 import time
 from tqdm import tqdm
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from id_allocator import render_keys
+from scale_factor import NUM_CUSTOMERS
 
 # Set random seed for reproducibility
 np.random.seed(42)
 
 # File path
-output_path = "/Users/jpetrides/Documents/Customers/Hotel/MGM"
+output_path = os.getenv("demo_output_dir", "/Users/jpetrides/Documents/Customers/Hotel/MGM")
 output_file = "MGM_CrossChannel_Touchpoints.parquet"
 
 # Define parameters
-num_customers = 150000  # Full size for production
+num_customers = NUM_CUSTOMERS  # Customer_1..Customer_N, shared with the other generators
 start_date = datetime(2025, 3, 1)
 end_date = datetime(2025, 4, 30)
 date_range = (end_date - start_date).days + 1
@@ -55,7 +60,7 @@ assert probability_sum == 1.0, f"Touchpoint probabilities sum to {probability_su
 customer_activity_prob = 0.85
 
 # Average number of interactions per active customer (log-normal distribution)
-avg_interactions_per_customer = 30  # This will give us ~3.8M records
+avg_interactions_per_customer = 30  # This will give us ~3.8M records at SF1
 
 # Generate data
 def generate_touchpoint_data():
@@ -67,9 +72,10 @@ def generate_touchpoint_data():
     
     # Global event counter for sequential IDs
     event_counter = 1
+    customer_ids = render_keys(np.arange(1, num_customers + 1), "Customer_").tolist()
     
     for i in tqdm(range(num_customers)):
-        customer_id = f"Customer_{i+1}"
+        customer_id = customer_ids[i]
         
         # Determine if this customer has any interactions
         if random.random() < customer_activity_prob:
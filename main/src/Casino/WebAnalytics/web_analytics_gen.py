@@ -7,6 +7,11 @@ from faker import Faker
 import pyarrow as pa
 import pyarrow.parquet as pq
 from tqdm import tqdm
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from id_allocator import render_keys
+from scale_factor import scaled
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -15,12 +20,12 @@ fake = Faker()
 Faker.seed(42)
 
 # Create output directory if it doesn't exist
-output_dir = os.path.expanduser("~/Documents/customers/hotel/mgm")
+output_dir = os.getenv("demo_output_dir", os.path.expanduser("~/Documents/customers/hotel/mgm"))
 os.makedirs(output_dir, exist_ok=True)
 
 # Constants
-NUM_VISITORS = 50000
-NUM_SESSIONS = 150000  # This will result in ~3 million page views with our parameters
+NUM_VISITORS = scaled(50000)
+NUM_SESSIONS = scaled(150000)  # At SF1 this will result in ~3 million page views with our parameters
 BATCH_SIZE = 1000  # Process sessions in batches of 1000
 START_DATE = datetime(2025, 4, 1)
 END_DATE = datetime(2025, 4, 30)
@@ -357,7 +362,7 @@ def generate_data():
     print("Generating synthetic web analytics data...")
     
     # Generate visitors
-    visitors = [f"Customer_{i}" for i in range(1, NUM_VISITORS + 1)]
+    visitors = render_keys(np.arange(1, NUM_VISITORS + 1), "Customer_").tolist()
     visit_counters = {visitor: 1 for visitor in visitors}
     
     # Initialize counters
@@ -0,0 +1,227 @@
+"""Benchmark the demo data generators.
+
+Runs each generator as its own process at a small, fixed scale factor (demo_scale_factor) with its
+output redirected to a scratch folder (demo_output_dir), then records wall time, rows/sec for every
+output table and peak RSS. Results are compared with the stored baseline and the run fails (exit
+code 1) when any table's rows/sec drops more than REGRESSION_THRESHOLD below it.
+
+    python benchmark_generators.py                      # all generators, compare with baseline
+    python benchmark_generators.py hotel casino         # just these
+    python benchmark_generators.py --update-baseline    # record the current numbers as the baseline
+
+Baselines are machine specific; record one on the machine the comparison runs on.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import duckdb
+import pyarrow.parquet as pq
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Fail when rows/sec falls more than this fraction below the baseline
+REGRESSION_THRESHOLD = 0.20
+
+# Generator script (relative to main/src), the scale factor it runs at and its output tables.
+# Outputs are files in the output folder; 'file.duckdb:Table' names a table inside a DuckDB file.
+BENCHMARKS = {
+    'hotel': {
+        'script': os.path.join('Hotel', 'Reservation Generator Prod.py'),
+        'scale_factor': 0.05,
+        'outputs': {
+            'Reservations3': 'hotel_reservations.duckdb:Reservations3',
+            'Hotel_Revenue_Daily': 'hotel_reservations.duckdb:Hotel_Revenue_Daily',
+            'Hotel_Revenue_Daily_Dtl': 'hotel_reservations.duckdb:Hotel_Revenue_Daily_Dtl',
+        },
+    },
+    'casino': {
+        'script': os.path.join('Casino', 'Slot_Trans.py'),
+        'scale_factor': 0.01,
+        'outputs': {
+            'machines': 'machines.parquet',
+            'sessions': 'sessions.parquet',
+            'transactions': 'transactions.parquet',
+            'session_summary': 'session_summary.parquet',
+            'daily_machine_revenue': 'daily_machine_revenue.parquet',
+            'daily_revenue': 'daily_revenue.parquet',
+        },
+    },
+    'web_analytics': {
+        'script': os.path.join('Casino', 'WebAnalytics', 'web_analytics_gen.py'),
+        'scale_factor': 0.01,
+        'outputs': {
+            'F_Page_View': 'F_Page_View.parquet',
+            'F_Engagement_Events': 'F_Engagement_Events.parquet',
+            'F_events_reservations': 'F_events_reservations.parquet',
+        },
+    },
+    'cross_channel': {
+        'script': os.path.join('Casino', 'WebAnalytics', 'cross_Channel_Journey.py'),
+        'scale_factor': 0.01,
+        'outputs': {
+            'MGM_CrossChannel_Touchpoints': 'MGM_CrossChannel_Touchpoints.parquet',
+        },
+    },
+    'call_center': {
+        'script': os.path.join('CallCenter', 'CallCenter2.py'),
+        'scale_factor': 0.01,
+        'outputs': {
+            'Dim_CC_agents': 'Dim_CC_agents.parquet',
+            'F_CC_calls': 'F_CC_calls.parquet',
+            'F_CC_call_ratings': 'F_CC_call_ratings.parquet',
+            'F_CC_call_issues': 'F_CC_call_issues.parquet',
+            'F_CC_agent_performance': 'F_CC_agent_performance.parquet',
+        },
+    },
+    'airline': {
+        'script': os.path.join('Airline', 'AK_Aircraft_Ground_Damage.py'),
+        'scale_factor': 0.1,
+        'outputs': {
+            'aircraft_ground_damage': 'aircraft_ground_damage_data.csv',
+        },
+    },
+    'ecommerce': {
+        'script': os.path.join('Common', 'ecommerce_massive.py'),
+        'scale_factor': 0.001,
+        'outputs': {
+            'ecommerce': 'large_ecommerce_dataset_fixed.parquet',
+        },
+    },
+}
+
+
+def count_rows(output_dir, output):
+    """Row count of one output, or None if the generator did not write it."""
+    file_name, _, table = output.partition(':')
+    path = os.path.join(output_dir, file_name)
+    if not os.path.exists(path):
+        return None
+    if table:
+        with duckdb.connect(path, read_only=True) as con:
+            return con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    if path.endswith('.parquet'):
+        return pq.ParquetFile(path).metadata.num_rows
+    return duckdb.sql(f"SELECT count(*) FROM read_csv_auto('{path}')").fetchone()[0]
+
+
+def run_benchmark(name, spec):
+    """Run one generator in a scratch folder and return its measurements."""
+    with tempfile.TemporaryDirectory(prefix=f'bench_{name}_') as output_dir:
+        env = dict(os.environ,
+                   demo_scale_factor=str(spec['scale_factor']),
+                   demo_output_dir=output_dir,
+                   s3_bucket_name='')  # keep ecommerce_massive from uploading the benchmark file
+        log_path = os.path.join(output_dir, 'generator.log')
+
+        start = time.perf_counter()
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, spec['script'])],
+                                       cwd=output_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+            # wait4 gives the child's own resource usage, including the largest RSS of any process
+            # it waited for (e.g. a multiprocessing pool)
+            _, status, usage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        # ru_maxrss is KB on Linux and bytes on macOS
+        peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+        result = {
+            'scale_factor': spec['scale_factor'],
+            'wall_time': round(wall_time, 2),
+            'peak_rss_mb': round(peak_rss_mb, 1),
+            'returncode': process.returncode,
+            'rows': {},
+            'rows_per_sec': {},
+        }
+        if process.returncode != 0:
+            with open(log_path) as log:
+                result['error'] = log.read()[-2000:]
+            return result
+
+        for table, output in spec['outputs'].items():
+            rows = count_rows(output_dir, output)
+            result['rows'][table] = rows
+            if rows is not None:
+                result['rows_per_sec'][table] = round(rows / wall_time, 1)
+        return result
+
+
+def compare(name, result, baseline):
+    """Regression messages for one generator against its baseline entry."""
+    if result['returncode'] != 0:
+        return [f"{name}: generator failed (exit code {result['returncode']})"]
+
+    problems = [f"{name}.{table}: no output written" for table, rows in result['rows'].items() if rows is None]
+    if baseline is None:
+        return problems
+    if baseline['scale_factor'] != result['scale_factor']:
+        return problems + [f"{name}: baseline was recorded at SF{baseline['scale_factor']}, rerun --update-baseline"]
+
+    for table, rows_per_sec in result['rows_per_sec'].items():
+        baseline_rate = baseline['rows_per_sec'].get(table)
+        if baseline_rate and rows_per_sec < baseline_rate * (1 - REGRESSION_THRESHOLD):
+            problems.append(f"{name}.{table}: {rows_per_sec:,.0f} rows/sec vs baseline {baseline_rate:,.0f} "
+                            f"({rows_per_sec / baseline_rate - 1:+.0%})")
+    return problems
+
+
+def print_result(name, result, baseline):
+    print(f"\n{name} (SF{result['scale_factor']}): {result['wall_time']:.2f}s, peak RSS {result['peak_rss_mb']:,.0f} MB", end='')
+    if baseline:
+        print(f" (baseline {baseline['wall_time']:.2f}s, {baseline['peak_rss_mb']:,.0f} MB)", end='')
+    print()
+    if 'error' in result:
+        print(result['error'])
+    for table, rows in result['rows'].items():
+        if rows is None:
+            print(f"  {table:<30} missing")
+            continue
+        line = f"  {table:<30} {rows:>12,} rows {result['rows_per_sec'][table]:>14,.0f} rows/sec"
+        baseline_rate = baseline['rows_per_sec'].get(table) if baseline else None
+        if baseline_rate:
+            line += f"  ({result['rows_per_sec'][table] / baseline_rate - 1:+.0%})"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the demo data generators.')
+    parser.add_argument('generators', nargs='*', help=f"any of {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    args = parser.parse_args()
+    unknown = set(args.generators) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown generator(s): {', '.join(sorted(unknown))}")
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+
+    results = {}
+    problems = []
+    for name in args.generators or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        results[name] = run_benchmark(name, BENCHMARKS[name])
+        baseline = None if args.update_baseline else baselines.get(name)
+        print_result(name, results[name], baseline)
+        problems += compare(name, results[name], baseline)
+
+    if args.update_baseline:
+        baselines.update({name: result for name, result in results.items() if result['returncode'] == 0})
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+
+    if problems:
+        print("\nRegressions:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nNo regressions.")
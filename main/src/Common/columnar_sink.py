@@ -0,0 +1,68 @@
+"""Columnar output sink shared by the demo data generators.
+
+Generators write typed arrays (or, for row-at-a-time generators, rows) into a ColumnarSink, which
+keeps them as Arrow record batches. The result goes to DuckDB as a registered Arrow table or a
+RecordBatchReader, or straight to Parquet/CSV, with no list-of-dicts -> pandas DataFrame copy.
+
+Scripts pick this up by adding the Common folder to sys.path:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+    from columnar_sink import ColumnarSink
+"""
+import pyarrow as pa
+
+
+class ColumnarSink:
+    """Accumulates generator output as Arrow record batches with a fixed schema."""
+
+    def __init__(self, schema, batch_size=100_000):
+        # schema is a pa.Schema or a list of (name, pa type) pairs
+        self.schema = schema if isinstance(schema, pa.Schema) else pa.schema(schema)
+        self.batch_size = batch_size
+        self.batches = []
+        self.num_rows = 0
+        self._pending_rows = []
+
+    def __len__(self):
+        return self.num_rows + len(self._pending_rows)
+
+    def append(self, columns):
+        """Append a batch given as {column name: array}; every schema column must be present."""
+        self.flush()
+        arrays = [pa.array(columns[field.name], type=field.type) for field in self.schema]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self.batches.append(batch)
+        self.num_rows += batch.num_rows
+
+    def append_row(self, row):
+        """Append one row (a dict; missing columns become null). Rows are packed every batch_size."""
+        self._pending_rows.append(row)
+        if len(self._pending_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Pack any pending rows into a record batch."""
+        if self._pending_rows:
+            batch = pa.RecordBatch.from_pylist(self._pending_rows, schema=self.schema)
+            self._pending_rows = []
+            self.batches.append(batch)
+            self.num_rows += batch.num_rows
+
+    def to_table(self):
+        """All batches as one Arrow table (no copy; batches become chunks)."""
+        self.flush()
+        return pa.Table.from_batches(self.batches, schema=self.schema)
+
+    def reader(self):
+        """All batches as a RecordBatchReader, for consumers that stream."""
+        self.flush()
+        return pa.RecordBatchReader.from_batches(self.schema, iter(self.batches))
+
+    def column(self, name):
+        """One column as a ChunkedArray."""
+        return self.to_table().column(name)
+
+    def register(self, con, view_name):
+        """Register the sink's rows with a DuckDB connection as view_name and return the name."""
+        con.register(view_name, self.to_table())
+        return view_name
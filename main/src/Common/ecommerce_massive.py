@@ -11,6 +11,8 @@ import boto3
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
 import os
+from id_allocator import render_keys
+from scale_factor import scaled
 
 # Initialize Faker for realistic data
 fake = Faker()
@@ -19,22 +21,22 @@ np.random.seed(42)
 random.seed(42)
 
 # Configuration
-TOTAL_RECORDS = 80_000_000
+TOTAL_RECORDS = scaled(80_000_000)
 CHUNK_SIZE = 1_000_000  # Process in chunks to manage memory
-OUTPUT_FILE = os.path.expanduser("~/Downloads/large_ecommerce_dataset_fixed.parquet")
+OUTPUT_FILE = os.path.join(os.getenv("demo_output_dir", os.path.expanduser("~/Downloads")), "large_ecommerce_dataset_fixed.parquet")
 
 # Pre-generate some lookup data for performance
 print("Generating lookup data...")
-n_customers = 2_000_000
-n_products = 50_000
-n_stores = 5_000
-n_employees = 10_000
+n_customers = scaled(2_000_000)
+n_products = scaled(50_000)
+n_stores = scaled(5_000)
+n_employees = scaled(10_000)
 
 # Generate base data
-customer_ids = [f"CUST_{i:08d}" for i in range(n_customers)]
-product_ids = [f"PROD_{i:06d}" for i in range(n_products)]
-store_ids = [f"STORE_{i:04d}" for i in range(n_stores)]
-employee_ids = [f"EMP_{i:05d}" for i in range(n_employees)]
+customer_ids = render_keys(np.arange(n_customers), "CUST_", 8)
+product_ids = render_keys(np.arange(n_products), "PROD_", 6)
+store_ids = render_keys(np.arange(n_stores), "STORE_", 4)
+employee_ids = render_keys(np.arange(n_employees), "EMP_", 5)
 
 # Product categories and subcategories
 categories = ['Electronics', 'Clothing', 'Home & Garden', 'Sports', 'Books', 'Toys', 'Food', 'Beauty']
@@ -78,8 +80,8 @@ def generate_chunk(chunk_num, chunk_size):
     
     data = {
         # Transaction identifiers
-        'transaction_id': [f"TXN_{chunk_num:04d}_{i:08d}" for i in range(chunk_size)],
-        'order_id': [f"ORD_{chunk_num:04d}_{i:08d}" for i in range(chunk_size)],
+        'transaction_id': render_keys(np.arange(chunk_size), f"TXN_{chunk_num:04d}_", 8),
+        'order_id': render_keys(np.arange(chunk_size), f"ORD_{chunk_num:04d}_", 8),
         'customer_id': np.random.choice(customer_ids, chunk_size),
         'product_id': np.random.choice(product_ids, chunk_size),
         'store_id': np.random.choice(store_ids, chunk_size),
@@ -0,0 +1,59 @@
+"""Unique integer IDs per table, and prefixed string keys (G0001, Customer_42) rendered in bulk.
+
+An IdAllocator hands out contiguous ranges per table, so keys never collide within a run. Parallel
+workers get their own block: the parent reserves a range per worker (ranges pickle as three ints)
+and each worker renders keys from it locally.
+
+    ids = IdAllocator()
+    stay_ids = ids.keys('stay', len(stays), 'S', 4)        # S0001, S0002, ...
+    blocks = [ids.reserve('reservation', n) for n in shard_sizes]
+
+render_keys works on any integer array, e.g. random foreign keys like Customer_{n}.
+
+Scripts pick this up by adding the Common folder to sys.path:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+    from id_allocator import IdAllocator, render_keys
+"""
+import threading
+
+import numpy as np
+
+
+def render_keys(ids, prefix='', width=0):
+    """prefix + zero-padded id for every id, as a NumPy string array (ids wider than width are kept whole)."""
+    keys = np.asarray(ids).astype(str)
+    if width:
+        keys = np.char.zfill(keys, width)
+    return np.char.add(prefix, keys) if prefix else keys
+
+
+class IdAllocator:
+    """Hands out contiguous, non-overlapping integer ID ranges per table."""
+
+    def __init__(self, next_ids=None, start=1):
+        # next_ids continues existing tables, e.g. {'reservation': max ReservationID + 1}
+        self.start = start
+        self._next_ids = dict(next_ids or {})
+        self._lock = threading.Lock()
+
+    def reserve(self, table, count):
+        """The next count IDs for table, as a range; nothing else will get them."""
+        with self._lock:
+            first = self._next_ids.get(table, self.start)
+            self._next_ids[table] = first + count
+        return range(first, first + count)
+
+    def ids(self, table, count):
+        """The next count IDs for table as an int64 array."""
+        block = self.reserve(table, count)
+        return np.arange(block.start, block.stop, dtype=np.int64)
+
+    def keys(self, table, count, prefix='', width=0):
+        """The next count IDs for table rendered as prefixed string keys."""
+        return render_keys(self.ids(table, count), prefix, width)
+
+    def next_id(self, table):
+        """The next ID that will be allocated for table."""
+        with self._lock:
+            return self._next_ids.get(table, self.start)
@@ -0,0 +1,168 @@
+"""Materialized, incrementally refreshed rollups in the DuckDB demo database.
+
+A MaterializedView stores its query's result as a table and records in MV_Refresh_State the highest
+load ID of its source seen at the last refresh - an integer column that every append to the source
+stamps with a higher value than the last (F_Slots_Transactions.LoadID is the day of the generator
+run a row was made in). A refresh finds the keys of the rollup (e.g. SessionID) that rows with a
+higher load ID belong to, deletes just those rows of the table and recomputes them, all in one
+transaction. Rows are found by when they were loaded, not by their timestamps, so a late row is
+caught however old its timestamp, and since appends keep the column in order DuckDB skips the row
+groups of earlier loads. The first refresh, or one with full=True, builds the whole table.
+
+    python materialized_view.py                          # refresh every view below
+    python materialized_view.py MV_Slots_Sessions        # refresh one
+    python materialized_view.py --full                   # rebuild from scratch
+    python materialized_view.py --check                  # refresh, then compare with a full recomputation
+
+The database is duckdb_path from .env. Sources are treated as append-only: rows deleted, or loaded
+without a higher load ID, are not seen until a --full refresh (run one after replacing a source).
+Hotel_Revenue_Daily and _DTL are not defined here: "Reservation Generator Prod.py" owns them, and its
+incremental mode (reservation_mode=incremental) refreshes them along with retiring check-ins that
+leave its window. Other scripts can define their own views:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+    from materialized_view import MaterializedView
+"""
+import argparse
+import os
+import time
+
+import duckdb
+from dotenv import load_dotenv
+
+STATE_TABLE = 'MV_Refresh_State'
+
+
+class MaterializedView:
+    """A query kept as a table, recomputed per key for the source rows added since the last refresh.
+
+    query selects the rollup with a {changed} placeholder in its WHERE clause, which becomes TRUE for
+    a full build and "<keys> IN (SELECT * FROM changed_keys)" for a refresh.
+    """
+
+    def __init__(self, name, query, key, source, load_id_column):
+        self.name = name
+        self.query = query
+        self.key = list(key)
+        self.source = source
+        self.load_id_column = load_id_column
+        # Keys with source rows loaded after the last refresh (its load ID bound as the parameter)
+        self.changed_keys = f"SELECT DISTINCT {', '.join(self.key)} FROM {source} WHERE {load_id_column} > ?"
+        keys = self.key[0] if len(self.key) == 1 else f"({', '.join(self.key)})"
+        self.keys_in_changed = f"{keys} IN (SELECT * FROM changed_keys)"
+
+    def _object_type(self, con):
+        """'BASE TABLE', 'VIEW' or None for the object called name."""
+        row = con.execute("SELECT table_type FROM information_schema.tables WHERE table_name = ?",
+                          [self.name.split('.')[-1]]).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, con, full=False):
+        """Bring the table up to date; returns (rows recomputed, keys recomputed or None when rebuilt, load ID)."""
+        con.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} "
+                    "(view_name VARCHAR PRIMARY KEY, last_load_id BIGINT, refreshed_at TIMESTAMP)")
+        con.begin()
+        try:
+            state = con.execute(f"SELECT last_load_id FROM {STATE_TABLE} WHERE view_name = ?", [self.name]).fetchone()
+            load_id = con.execute(f"SELECT max({self.load_id_column}) FROM {self.source}").fetchone()[0]
+            object_type = self._object_type(con)
+
+            # Rebuilt too: a view that has never seen a source row (load ID NULL), and one whose
+            # source now ends at a lower load ID than it has seen, i.e. was replaced by a new run
+            if (full or state is None or state[0] is None or object_type != 'BASE TABLE'
+                    or load_id is None or load_id < state[0]):
+                if object_type == 'VIEW':
+                    con.execute(f"DROP VIEW {self.name}")  # e.g. the plain view this table replaces
+                con.execute(f"CREATE OR REPLACE TABLE {self.name} AS {self.query.format(changed='TRUE')}")
+                rows = con.execute(f"SELECT count(*) FROM {self.name}").fetchone()[0]
+                keys = None
+            else:
+                con.execute(f"CREATE OR REPLACE TEMP TABLE changed_keys AS {self.changed_keys}", [state[0]])
+                keys = con.execute("SELECT count(*) FROM changed_keys").fetchone()[0]
+                con.execute(f"DELETE FROM {self.name} WHERE {self.keys_in_changed}")
+                rows = con.execute(f"INSERT INTO {self.name} {self.query.format(changed=self.keys_in_changed)}"
+                                   ).fetchone()[0]
+                con.execute("DROP TABLE changed_keys")
+
+            con.execute(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, current_timestamp)",
+                        [self.name, load_id])
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        return rows, keys, load_id
+
+    def check(self, con):
+        """Rows that differ between the table and a full recomputation (0 when they match).
+
+        DOUBLE columns are compared rounded to 6 places, since sums over a different grouping of the
+        same rows can differ in the last bits.
+        """
+        columns = ', '.join(
+            f"round({name}, 6)" if column_type == 'DOUBLE' else name
+            for name, column_type in con.execute(
+                f"SELECT column_name, column_type FROM (DESCRIBE {self.name})").fetchall())
+        stored = f"SELECT {columns} FROM {self.name}"
+        recomputed = f"SELECT {columns} FROM ({self.query.format(changed='TRUE')})"
+        return con.execute(f'''
+        SELECT (SELECT count(*) FROM ({stored} EXCEPT ALL {recomputed}))
+             + (SELECT count(*) FROM ({recomputed} EXCEPT ALL {stored}))
+        ''').fetchone()[0]
+
+
+# Per-session totals of slot play; a session whose transactions arrive over more than one load (a
+# late row, a session still running at the last load) is recomputed on each of them
+MV_SLOTS_SESSIONS = MaterializedView(
+    name='MV_Slots_Sessions',
+    query='''
+    SELECT
+        SessionID,
+        MachineID,
+        CustomerID,
+        MIN(Timestamp) AS StartTime,
+        MAX(Timestamp) AS EndTime,
+        SUM(BetAmount) AS TotalBets,
+        SUM(PayoutAmount) AS TotalPayouts,
+        SUM(BetAmount) - SUM(PayoutAmount) AS Revenue,
+        COUNT(*) AS TransactionCount
+    FROM F_Slots_Transactions
+    WHERE {changed}
+    GROUP BY SessionID, MachineID, CustomerID
+    ''',
+    key=['SessionID'],
+    source='F_Slots_Transactions',
+    load_id_column='LoadID',
+)
+
+VIEWS = {view.name: view for view in (MV_SLOTS_SESSIONS,)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Refresh materialized rollups in the demo DuckDB database.')
+    parser.add_argument('views', nargs='*', metavar='view',
+                        help=f"views to refresh (default: all of {', '.join(VIEWS)})")
+    parser.add_argument('--full', action='store_true', help='rebuild instead of refreshing incrementally')
+    parser.add_argument('--check', action='store_true', help='compare each view with a full recomputation')
+    args = parser.parse_args()
+    unknown = [name for name in args.views if name not in VIEWS]
+    if unknown:
+        parser.error(f"unknown view {', '.join(unknown)}; choose from {', '.join(VIEWS)}")
+
+    # Load environment variables
+    load_dotenv()
+    con = duckdb.connect(os.getenv('duckdb_path'))
+
+    mismatched = False
+    for name in args.views or VIEWS:
+        view = VIEWS[name]
+        start = time.perf_counter()
+        rows, keys, load_id = view.refresh(con, full=args.full)
+        action = 'rebuilt' if keys is None else f"recomputed {keys} keys,"
+        print(f"{time.perf_counter() - start:8.2f}s {name}: {action} {rows} rows; up to load {load_id}")
+        if args.check:
+            differences = view.check(con)
+            mismatched |= differences > 0
+            print(f"{'':9} {name}: {'matches' if not differences else f'{differences} rows differ from'} a full recomputation")
+    con.close()
+    if mismatched:
+        raise SystemExit(1)
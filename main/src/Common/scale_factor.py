@@ -0,0 +1,35 @@
+"""Scale factor shared by the demo data generators.
+
+Set demo_scale_factor (environment or .env) to size every generator at once, TPC style: SF1 is the
+stock demo size and SF10 / SF100 multiply fact and dimension cardinalities by 10 / 100, e.g.
+
+    demo_scale_factor=10 python "Reservation Generator Prod.py"
+
+Entities that more than one dataset refers to are sized here, once, so an ID drawn by one generator
+(Customer_{n} in calls, slot sessions and touchpoints, CustomerID in Reservations3) resolves against
+the others and against D_Customer at every scale factor.
+
+Scripts pick this up by adding the Common folder to sys.path:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+    from scale_factor import scaled, NUM_CUSTOMERS
+"""
+import os
+
+from dotenv import load_dotenv
+
+# Read .env here rather than relying on the importing script to have done so first
+load_dotenv()
+
+SCALE_FACTOR = float(os.getenv('demo_scale_factor', '1'))
+
+
+def scaled(base, minimum=1):
+    """A count sized for SF1, scaled to the current scale factor (never below minimum)."""
+    return max(minimum, int(round(base * SCALE_FACTOR)))
+
+
+# Shared ID universes; generators draw IDs 1..N from these
+NUM_CUSTOMERS = scaled(150_000)        # Customer_{n} / CustomerID
+NUM_HOTELS = scaled(100)               # HotelID / Property_Code_{n}
+NUM_RESERVATIONS = scaled(1_900_000)   # ReservationIDs in Reservations3 (about 19,000 per hotel)
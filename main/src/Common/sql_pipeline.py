@@ -0,0 +1,271 @@
+"""Run a SQL script of table updates (e.g. Hotel/F_Reservation_Updates.sql) as one pipeline.
+
+The script is split into steps (one per statement, named after the "-- N. HEADING" comment above
+it). Consecutive row-local steps - UPDATE <table> SET col = expr [WHERE cond] with no FROM/WITH and
+no volatile functions - are fused into a single UPDATE: steps that write disjoint columns become
+separate assignments of its SET, and a step that reads a column an earlier step wrote gets that
+step's expression substituted in, so the table is rewritten once per run of steps instead of once
+per step. Everything else (joins, CTEs, RANDOM()) runs as written, in order. The whole script runs
+in one transaction; timing and rows touched are reported per statement run.
+
+    python sql_pipeline.py "../Hotel/F_Reservation_Updates.sql"              # fused
+    python sql_pipeline.py "../Hotel/F_Reservation_Updates.sql" --no-fuse    # one statement per step
+    python sql_pipeline.py "../Hotel/F_Reservation_Updates.sql" --dry-run    # print the plan only
+
+The database is duckdb_path from .env.
+"""
+import argparse
+import os
+import re
+import time
+
+import duckdb
+from dotenv import load_dotenv
+
+# Functions whose result changes per call; substituting a step that uses one into several later
+# expressions would draw it several times, so such steps run on their own
+VOLATILE_FUNCTIONS = re.compile(r'\b(random|uuid|gen_random_uuid|setseed)\s*\(', re.I)
+
+STRING_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.S)
+IDENTIFIER = re.compile(r'"((?:[^"]|"")+)"|([A-Za-z_][\w$]*)')
+
+
+class Step:
+    """One statement of the script, with the columns it reads and writes when it is row-local."""
+
+    def __init__(self, number, name, sql):
+        self.number = number
+        self.name = name
+        self.sql = sql
+        self.table = None        # set for row-local updates only
+        self.assignments = []    # [(column as written, normalised column, column type, expression)]
+        self.where = None
+        self.reads = set()
+        self.writes = set()
+
+    @property
+    def fusable(self):
+        return self.table is not None
+
+    def __repr__(self):
+        return f"Step({self.number}, {self.name!r})"
+
+
+def _mask(sql):
+    """sql with string literals and comments blanked out (same length), for keyword/paren scanning."""
+    return STRING_OR_COMMENT.sub(lambda m: ' ' * len(m.group(0)), sql)
+
+
+def _normalise(identifier):
+    return identifier.strip().strip('"').lower()
+
+
+def _top_level_matches(sql, pattern):
+    """Matches of a regex in sql that occur outside parentheses, strings and comments."""
+    masked = _mask(sql)
+    matches, depth, i = [], 0, 0
+    while i < len(masked):
+        char = masked[i]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0:
+            match = pattern.match(masked, i)
+            if match:
+                matches.append(match)
+                i = match.end()
+                continue
+        i += 1
+    return matches
+
+
+def _top_level_split(sql, separator):
+    """Split sql on a regex separator occurring outside parentheses, strings and comments."""
+    parts, start = [], 0
+    for match in _top_level_matches(sql, separator):
+        parts.append(sql[start:match.start()])
+        start = match.end()
+    parts.append(sql[start:])
+    return parts
+
+
+def _strip_comments(sql):
+    return STRING_OR_COMMENT.sub(lambda m: m.group(0) if m.group(0).startswith("'") else '', sql).strip()
+
+
+def split_statements(script):
+    """[(heading comment or None, statement)] for every non-empty statement in the script."""
+    statements = []
+    section = None  # the last "-- N. HEADING" seen, for statements without a comment of their own
+    for i, chunk in enumerate(_top_level_split(script, re.compile(';'))):
+        masked = _mask(chunk)
+        if not masked.strip():
+            continue
+        start = len(masked) - len(masked.lstrip())
+        # The heading is the last "-- N. HEADING" comment before the statement, else its first comment
+        # line, else the section it is in (a comment on the same line as the previous statement's ;
+        # belongs to that statement; the first chunk has no previous statement)
+        prefix = chunk[:start] if i == 0 or chunk.startswith('\n') else chunk[:start].partition('\n')[2]
+        comments = [line.strip().strip('- ') for line in prefix.splitlines()
+                    if line.strip().startswith('--') and line.strip('-= \t')]
+        numbered = [comment for comment in comments if re.match(r'\d+\.\s', comment)]
+        section = numbered[-1] if numbered else section
+        heading = numbered[-1] if numbered else (comments[0] if comments else section)
+        statements.append((heading, chunk[start:].rstrip()))
+    return statements
+
+
+def columns_in(sql, table_columns):
+    """Normalised table columns referenced anywhere in sql."""
+    found = set()
+    for quoted, bare in IDENTIFIER.findall(_mask(sql)):
+        name = _normalise(quoted or bare)
+        if name in table_columns:
+            found.add(name)
+    return found
+
+
+def analyse(step, con):
+    """Fill in table/assignments/reads/writes when step is a row-local UPDATE."""
+    match = re.match(r'UPDATE\s+([\w."]+)\s+SET\b', _mask(step.sql), re.I)
+    if not match:
+        return  # CTEs, aliased updates and anything that isn't an UPDATE run as written
+    table = match.group(1)
+
+    body = step.sql[match.end():]
+    keywords = _top_level_matches(body, re.compile(r'\b(FROM|WHERE|RETURNING)\b', re.I))
+    if any(keyword.group(1).upper() != 'WHERE' for keyword in keywords) or len(keywords) > 1:
+        return  # UPDATE ... FROM joins run as written
+    clauses = [body[:keywords[0].start()], body[keywords[0].end():]] if keywords else [body]
+
+    table_columns = {_normalise(name): column_type for name, column_type in con.execute(
+        f"SELECT column_name, column_type FROM (DESCRIBE {table})").fetchall()}
+    assignments = []
+    for assignment in _top_level_split(clauses[0], re.compile(',')):
+        column, _, expression = assignment.partition('=')
+        column = _strip_comments(column)
+        if _normalise(column) not in table_columns:
+            return
+        assignments.append((column, _normalise(column), table_columns[_normalise(column)], _strip_comments(expression)))
+    where = _strip_comments(clauses[1]) if len(clauses) == 2 else None
+    if VOLATILE_FUNCTIONS.search(_mask(body)):
+        return
+
+    step.table = table
+    step.assignments = assignments
+    step.where = where
+    step.writes = {normalised for _, normalised, _, _ in assignments}
+    step.reads = columns_in(' '.join(expression for _, _, _, expression in assignments) + ' ' + (where or ''),
+                            table_columns)
+
+
+def parse_script(script, con):
+    steps = []
+    for number, (heading, sql) in enumerate(split_statements(script), start=1):
+        step = Step(number, heading or f"Step {number}", sql)
+        analyse(step, con)
+        steps.append(step)
+    return steps
+
+
+def plan(steps, fuse=True):
+    """Group steps into the statements to run: runs of fusable steps on the same table, or single steps."""
+    groups = []
+    for step in steps:
+        if (fuse and step.fusable and groups and groups[-1][0].fusable
+                and groups[-1][0].table == step.table):
+            groups[-1].append(step)
+        else:
+            groups.append([step])
+    return groups
+
+
+def substitute(sql, expressions):
+    """sql with references to the columns in expressions ({normalised column: expression}) replaced."""
+    masked = _mask(sql)
+    pieces, start = [], 0
+    for match in IDENTIFIER.finditer(masked):
+        name = _normalise(match.group(0))
+        qualified = masked[:match.start()].rstrip().endswith('.')
+        function_call = masked[match.end():].lstrip().startswith('(')
+        if name in expressions and not qualified and not function_call:
+            pieces += [sql[start:match.start()], f"({expressions[name]})"]
+            start = match.end()
+    return ''.join(pieces) + sql[start:]
+
+
+def fused_sql(group):
+    """One UPDATE applying every step in group, in order."""
+    expressions = {}  # normalised column -> expression for its value after the steps so far
+    columns = {}      # normalised column -> column as written
+    for step in group:
+        updated = {}
+        for column, normalised, column_type, expression in step.assignments:
+            expression = substitute(expression, expressions)
+            if step.where:
+                expression = f"CASE WHEN {substitute(step.where, expressions)} THEN {expression} " \
+                             f"ELSE {expressions.get(normalised, column)} END"
+            # Cast back to the column type after every step, as the separate UPDATEs would
+            updated[normalised] = f"CAST({expression} AS {column_type})"
+            columns[normalised] = column
+        expressions.update(updated)
+
+    assignments = ',\n    '.join(f"{columns[normalised]} = {expression}" for normalised, expression in expressions.items())
+    return f"UPDATE {group[0].table}\nSET {assignments}"
+
+
+def statement_for(group):
+    return group[0].sql if len(group) == 1 else fused_sql(group)
+
+
+def run_pipeline(con, steps, fuse=True):
+    """Run the steps in one transaction; returns [(steps, seconds, rows touched)] per statement run."""
+    results = []
+    con.begin()
+    try:
+        for group in plan(steps, fuse):
+            start = time.perf_counter()
+            row = con.execute(statement_for(group)).fetchone()
+            results.append((group, time.perf_counter() - start, row[0] if row else None))
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    return results
+
+
+def print_plan(groups):
+    for group in groups:
+        if len(group) == 1:
+            print(f"\n-- {group[0].number}. {group[0].name} (as written)")
+        else:
+            print(f"\n-- {', '.join(str(step.number) for step in group)} fused: "
+                  f"{'; '.join(step.name for step in group)}")
+        print(statement_for(group) + ';')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a SQL update script as one fused, transactional pipeline.')
+    parser.add_argument('script')
+    parser.add_argument('--no-fuse', action='store_true', help='run every step as its own statement')
+    parser.add_argument('--dry-run', action='store_true', help='print the statements that would run')
+    args = parser.parse_args()
+
+    # Load environment variables
+    load_dotenv()
+    con = duckdb.connect(os.getenv('duckdb_path'))
+
+    with open(args.script) as f:
+        steps = parse_script(f.read(), con)
+
+    if args.dry_run:
+        print_plan(plan(steps, not args.no_fuse))
+    else:
+        total_start = time.perf_counter()
+        results = run_pipeline(con, steps, not args.no_fuse)
+        for group, seconds, rows in results:
+            label = "; ".join(step.name for step in group)
+            print(f"{seconds:8.2f}s {rows if rows is not None else '-':>12} rows  {label}")
+        print(f"{time.perf_counter() - total_start:8.2f}s total, {len(results)} statements for {len(steps)} steps")
+    con.close()
@@ -0,0 +1,144 @@
+"""Streaming multi-table writer shared by the demo data generators.
+
+Generators that produce their tables a chunk at a time hand each chunk to a TableWriter, which
+appends it to that table's own Parquet (or CSV) file from a background thread. Chunks become row
+groups, so nothing accumulates in memory, and Arrow encoding and file I/O overlap with generating the
+next chunk. The queue between the two is bounded: a generator that gets ahead of the writer waits.
+
+    with TableWriter(output_dir, file_format='parquet') as writer:
+        for chunk in chunks:
+            writer.write('guests', guest_columns)     # {column name: array}
+            writer.write('stays', stays_rows)         # or a list of row dicts
+            writer.write('sessions/month=2024-01/part-0', batch)   # names can include folders
+
+Every CSV is written in one dialect, pyarrow's: strings and the header double-quoted, booleans
+True/False (csv_ready). Use write_csv for whole tables so they match the streamed ones.
+
+Scripts pick this up by adding the Common folder to sys.path:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+    from table_writer import TableWriter
+"""
+import os
+import queue
+import threading
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+FILE_FORMATS = ('parquet', 'csv')
+
+
+def to_arrow(data, schema=None):
+    """A chunk (Arrow table or record batch, {column name: array} or a list of row dicts) as an Arrow table."""
+    if isinstance(data, pa.Table):
+        table = data
+    elif isinstance(data, pa.RecordBatch):
+        table = pa.Table.from_batches([data])
+    elif isinstance(data, dict):
+        table = pa.table(data)
+    else:
+        table = pa.Table.from_pylist(data)
+    # Later chunks take the types of the table's first chunk
+    return table.cast(schema) if schema is not None and table.schema != schema else table
+
+
+def num_rows(data):
+    """Rows in a chunk, without converting it (a column dict counts the rows of its first column)."""
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.num_rows
+    if isinstance(data, dict):
+        return len(next(iter(data.values()), ()))
+    return len(data)
+
+
+def csv_ready(table):
+    """table with booleans as True/False (a 1-byte dictionary column), as csv.DictWriter writes them.
+
+    Null booleans stay null, which the CSV writer leaves empty.
+    """
+    for i, field in enumerate(table.schema):
+        if pa.types.is_boolean(field.type):
+            indices = table.column(i).combine_chunks().cast(pa.int8())
+            table = table.set_column(i, field.name, pa.DictionaryArray.from_arrays(indices, ["False", "True"]))
+    return table
+
+
+def write_csv(data, path):
+    """Write a chunk as one CSV file, with booleans as True/False (csv_ready)."""
+    pacsv.write_csv(csv_ready(to_arrow(data)), path)
+
+
+class TableWriter:
+    """Appends chunks of several tables to one file per table, on a background thread."""
+
+    def __init__(self, output_dir, file_format='parquet', max_pending=8):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"file_format must be one of {', '.join(FILE_FORMATS)}, not {file_format!r}")
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.rows = {}          # table name -> rows written
+        self._schemas = {}
+        self._writers = {}
+        self._error = None
+        # At most max_pending chunks wait to be written; write() blocks beyond that
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='TableWriter', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def path(self, name):
+        return os.path.join(self.output_dir, f"{name}.{self.file_format}")
+
+    def write(self, name, data):
+        """Queue one chunk of table name for writing; empty chunks are skipped."""
+        self._raise_error()
+        # Conversion to Arrow happens on the writer thread, overlapping with generating the next chunk
+        if num_rows(data):
+            self._queue.put((name, data))
+
+    def close(self):
+        """Write everything still queued, close the files and report rows per table."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+        for name, rows in self.rows.items():
+            print(f"Successfully wrote {rows} rows to {self.path(name)}")
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("writing a table chunk failed") from self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                continue  # keep draining so a blocked write() returns and sees the error
+            try:
+                self._write_chunk(*item)
+            except Exception as error:
+                self._error = error
+        for writer in self._writers.values():
+            writer.close()
+
+    def _write_chunk(self, name, data):
+        table = to_arrow(data, self._schemas.get(name))
+        if name not in self._writers:
+            self._schemas[name] = table.schema
+            os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+            if self.file_format == 'parquet':
+                self._writers[name] = pq.ParquetWriter(self.path(name), table.schema)
+            else:
+                self._writers[name] = pacsv.CSVWriter(self.path(name), csv_ready(table).schema)
+        self._writers[name].write_table(table if self.file_format == 'parquet' else csv_ready(table))
+        self.rows[name] = self.rows.get(name, 0) + table.num_rows
@@ -1,17 +1,28 @@
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import random
 import uuid
 from datetime import datetime, timedelta
 import os
+import sys
 from pathlib import Path
 import pantab
 
+# frame_to_hyper takes the Arrow table directly from pantab 4 on; earlier versions need a pandas DataFrame
+if int(pantab.__version__.split('.')[0]) < 4:
+    raise ImportError(f"CJA.py needs pantab>=4 (found {pantab.__version__}): pip install 'pantab>=4'")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from columnar_sink import ColumnarSink
+from scale_factor import scaled
+from table_writer import write_csv
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
 # Define constants
-NUM_VISITORS = 1000
+NUM_VISITORS = scaled(1000)
 MIN_SESSIONS = 2
 MAX_SESSIONS = 5
 DAYS = 30
@@ -81,8 +92,26 @@ PATH_TEMPLATES = [
     ['home', 'product', 'cart', 'checkout'],
 ]
 
+EVENT_SCHEMA = pa.schema([
+    ('visitor_id', pa.string()),
+    ('session_id', pa.string()),
+    ('timestamp', pa.timestamp('s')),
+    ('traffic_source', pa.string()),
+    ('traffic_medium', pa.string()),
+    ('landing_page', pa.string()),
+    ('event_type', pa.string()),
+    ('page_path', pa.string()),
+    ('product_id', pa.string()),
+    ('product_name', pa.string()),
+    ('product_category', pa.string()),
+    ('product_price', pa.float64()),
+    ('device_type', pa.string()),
+    ('order_id', pa.string()),
+    ('revenue', pa.float64())
+])
+
 # Generate end date (today) and start date
-end_date = datetime.now()
+end_date = datetime.now().replace(microsecond=0)
 start_date = end_date - timedelta(days=DAYS)
 
 def generate_traffic_source():
@@ -183,7 +212,7 @@ def generate_path(visitor_id, session_id, traffic_source, traffic_medium, device
         event = {
             'visitor_id': visitor_id,
             'session_id': session_id,
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': timestamp,
             'traffic_source': traffic_source,
             'traffic_medium': traffic_medium,
             'landing_page': landing_page,
@@ -256,27 +285,23 @@ def generate_visitor_data(visitor_id):
     return visitor_events
 
 def generate_dataset():
-    """Generate the complete dataset"""
-    all_events = []
+    """Generate the complete dataset as an Arrow table"""
+    all_events = ColumnarSink(EVENT_SCHEMA)
     
     # Generate visitor IDs
     visitor_ids = [f"V{uuid.uuid4().hex[:8]}" for _ in range(NUM_VISITORS)]
     
     # Generate data for each visitor
     for visitor_id in visitor_ids:
-        visitor_events = generate_visitor_data(visitor_id)
-        all_events.extend(visitor_events)
-    
-    # Convert to DataFrame and sort by timestamp
-    df = pd.DataFrame(all_events)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp')
+        for event in generate_visitor_data(visitor_id):
+            all_events.append_row(event)
     
-    return df
+    # Sort by timestamp
+    return all_events.to_table().sort_by('timestamp')
 
 # Generate the dataset
 print("Generating e-commerce journey dataset...")
-ecommerce_df = generate_dataset()
+ecommerce_events = generate_dataset()
 
 # Create output directory if it doesn't exist
 output_dir = Path(os.path.expanduser("~/Documents/Demo Data/CJA"))
@@ -285,26 +310,27 @@ output_file = output_dir / "ecommerce_journey_data.hyper"
 
 # Save to Hyper file using pantab
 print(f"Saving dataset to {output_file}...")
-pantab.frame_to_hyper(ecommerce_df, output_file, table="ecommerce_journey_data")
+pantab.frame_to_hyper(ecommerce_events, output_file, table="ecommerce_journey_data")
 
-print(f"Dataset generated with {len(ecommerce_df)} events from {NUM_VISITORS} visitors.")
+print(f"Dataset generated with {ecommerce_events.num_rows} events from {NUM_VISITORS} visitors.")
 print(f"Data saved to: {output_file}")
 
 # After creating the Hyper file
 csv_output_file = output_dir / "ecommerce_journey_data.csv"
 print(f"Saving dataset to {csv_output_file}...")
-ecommerce_df.to_csv(csv_output_file, index=False)
+write_csv(ecommerce_events, csv_output_file)
 print(f"CSV data saved to: {csv_output_file}")
 
 # Display sample of the data
 print("\nSample data:")
-print(ecommerce_df.head())
+print(ecommerce_events.slice(0, 5))
 
 # Display summary statistics
+event_counts = {row['values']: row['counts'] for row in ecommerce_events['event_type'].value_counts().to_pylist()}
 print("\nSummary statistics:")
-print(f"Total sessions: {ecommerce_df['session_id'].nunique()}")
-print(f"Total page views: {len(ecommerce_df[ecommerce_df['event_type'] == 'page_view'])}")
-print(f"Total product views: {len(ecommerce_df[ecommerce_df['event_type'] == 'product_view'])}")
-print(f"Total add to carts: {len(ecommerce_df[ecommerce_df['event_type'] == 'add_to_cart'])}")
-print(f"Total purchases: {len(ecommerce_df[ecommerce_df['event_type'] == 'purchase'])}")
-print(f"Total revenue: ${ecommerce_df['revenue'].sum():.2f}")
\ No newline at end of file
+print(f"Total sessions: {pc.count_distinct(ecommerce_events['session_id']).as_py()}")
+print(f"Total page views: {event_counts.get('page_view', 0)}")
+print(f"Total product views: {event_counts.get('product_view', 0)}")
+print(f"Total add to carts: {event_counts.get('add_to_cart', 0)}")
+print(f"Total purchases: {event_counts.get('purchase', 0)}")
+print(f"Total revenue: ${(pc.sum(ecommerce_events['revenue']).as_py() or 0):.2f}")
\ No newline at end of file
@@ -1,11 +1,20 @@
 import random
+import numpy as np
 import datetime
+import os
+import sys
 from tableauhyperapi import HyperProcess, Connection, Telemetry, TableDefinition, SqlType, Inserter, CreateMode
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from id_allocator import render_keys
+from scale_factor import NUM_CUSTOMERS
+
+# One row per customer, Customer_1..Customer_N, so the IDs drawn by the fact generators all resolve
+customer_ids = iter(render_keys(np.arange(1, NUM_CUSTOMERS + 1), "Customer_").tolist())
 
 # Define the column names and their corresponding data types
 columns = [
-    ("Customer_ID", SqlType.text(), lambda: f"Customer_{random.randint(1, 100000)}"),
+    ("Customer_ID", SqlType.text(), lambda: next(customer_ids)),
     ("Rewards_Level", SqlType.text(), lambda: random.choice(["Blue", "Bronze","Silver","Gold","Non Member"])),
     ("Customer_Name", SqlType.text(), lambda: f"CustomerName{random.randint(1, 6000)}"),
     ("Loyalty Number", SqlType.text(), lambda: f"Loyalty_{random.randint(1, 100000000)}"),
@@ -18,7 +27,7 @@ columns = [
 hyper_file_path = "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Dim_Customer.hyper"
 
 # Define the number of rows to generate
-num_rows = 160000
+num_rows = NUM_CUSTOMERS
 
 # Create the Tableau Hyper file
 with HyperProcess(telemetry=Telemetry.SEND_USAGE_DATA_TO_TABLEAU) as hyper:
@@ -1,12 +1,20 @@
 import random
 import datetime
+import itertools
+import os
+import sys
 from tableauhyperapi import HyperProcess, Connection, Telemetry, TableDefinition, SqlType, Inserter, CreateMode
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled
+
+# Sequential codes, so Property_Code_1..Property_Code_N referenced by the fact generators all resolve
+property_codes = itertools.count(1)
 
 # Define the column names and their corresponding data types
 columns = [
  
-    ("Property_Code", SqlType.text(), lambda: f"Property_Code_{random.randint(1, 600000)}"),
+    ("Property_Code", SqlType.text(), lambda: f"Property_Code_{next(property_codes)}"),
     ("Year_Opened",SqlType.big_int(),lambda: random.randint(2005, 2024)),
     ("Property", SqlType.text(), lambda: f"Property_{random.randint(1, 6000)}"),
     ("Region", SqlType.text(), lambda: f"Region_{random.randint(1, 10)}"),
@@ -36,7 +44,7 @@ columns = [
 hyper_file_path = "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Hotel/Dim_Property.hyper"
 
 # Define the number of rows to generate
-num_rows = 5000
+num_rows = scaled(5000)
 
 # Create the Tableau Hyper file
 with HyperProcess(telemetry=Telemetry.SEND_USAGE_DATA_TO_TABLEAU) as hyper:
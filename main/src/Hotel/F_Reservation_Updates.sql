@@ -1,86 +1,92 @@
+-- 1. SEASONALITY RULES
+-- ============================================
+-- Seasonal ADR multipliers are data: every metro belongs to a market, and each rule gives a
+-- multiplier for a market (or one metro in it) on matching months, days of the month and days of
+-- the week (NULL = any). Where several rules match, the lowest priority wins; no match = 1.0.
+-- Add a city with a row in TTH_Seasonality_Markets, an event with a row in TTH_Seasonality_Rules.
+CREATE OR REPLACE TABLE main.TTH_Seasonality_Markets AS
+SELECT * FROM (VALUES
+    -- WARM WEATHER DESTINATIONS - Winter Peak
+    ('Miami', 'Warm'), ('Miami - Fort Lauderdale', 'Warm'), ('Tampa', 'Warm'),
+    ('Tampa - St. Petersburg', 'Warm'), ('Orlando', 'Warm'), ('Phoenix', 'Warm'),
+    ('Phoenix - Mesa', 'Warm'), ('San Diego', 'Warm'), ('San Diego - Chula Vista', 'Warm'),
+    ('Los Angeles', 'Warm'), ('Los Angeles - Long Beach', 'Warm'),
+    -- LAS VEGAS - Special Events + Weekends
+    ('Las Vegas', 'Las Vegas'),
+    -- NORTHEAST CITIES - Fall/Spring Peak
+    ('Boston', 'Northeast'), ('Boston - Cambridge', 'Northeast'), ('New York', 'Northeast'),
+    ('New York - Newark', 'Northeast'), ('Philadelphia', 'Northeast'), ('Philadelphia - Camden', 'Northeast'),
+    ('Washington', 'Northeast'), ('Washington - Arlington', 'Northeast'), ('Baltimore', 'Northeast'),
+    ('Pittsburgh, PA', 'Northeast'),
+    -- TEXAS CITIES - Avoid summer heat
+    ('Austin', 'Texas'), ('Dallas', 'Texas'), ('Dallas - Fort Worth', 'Texas'),
+    ('Houston', 'Texas'), ('Houston - The Woodlands', 'Texas'), ('San Antonio', 'Texas'),
+    -- MIDWEST/COLD CITIES - Summer Peak
+    ('Chicago', 'Midwest'), ('Chicago - Naperville', 'Midwest'), ('Minneapolis', 'Midwest'),
+    ('Minneapolis - St. Paul', 'Midwest'), ('Detroit', 'Midwest'), ('Detroit - Warren', 'Midwest'),
+    ('Cincinnati, OH', 'Midwest'), ('St. Louis, MO', 'Midwest'),
+    -- PACIFIC NORTHWEST - Summer Peak
+    ('Seattle', 'Pacific Northwest'), ('Seattle - Tacoma', 'Pacific Northwest'), ('Portland', 'Pacific Northwest'),
+    -- CALIFORNIA CITIES - Steady with slight seasonal
+    ('San Francisco', 'California'), ('San Francisco - Oakland', 'California'), ('Sacramento', 'California'),
+    -- MOUNTAIN CITIES - Winter sports + Summer
+    ('Denver', 'Mountain'), ('Denver - Aurora', 'Mountain')
+) AS markets(metro_area, market);
+
+CREATE OR REPLACE TABLE main.TTH_Seasonality_Rules AS
+SELECT * FROM (VALUES
+    -- market, metro, months, day from, day to, days of week (DAYOFWEEK), multiplier, priority
+    ('Warm', NULL, [12, 1, 2, 3], NULL, NULL, NULL, 1.35, 1),            -- Winter peak
+    ('Warm', NULL, [6, 7, 8], NULL, NULL, NULL, 0.85, 2),                -- Summer low
+    ('Las Vegas', NULL, [1], 5, 12, NULL, 1.8, 1),                       -- CES
+    ('Las Vegas', NULL, [12], 31, 31, NULL, 2.2, 2),                     -- NYE
+    ('Las Vegas', NULL, NULL, NULL, NULL, [6, 7], 1.4, 3),               -- Weekends
+    ('Las Vegas', NULL, NULL, NULL, NULL, NULL, 1.1, 4),                 -- Every other night
+    ('Northeast', NULL, [9, 10], NULL, NULL, NULL, 1.3, 1),              -- Fall foliage
+    ('Northeast', NULL, [5, 6], NULL, NULL, NULL, 1.25, 2),              -- Graduation/tourism
+    ('Northeast', NULL, [1, 2], NULL, NULL, NULL, 0.85, 3),              -- Winter low
+    ('Northeast', NULL, [12], NULL, NULL, NULL, 1.15, 4),                -- Holidays
+    ('Texas', 'Austin', [3], NULL, NULL, NULL, 2.0, 1),                  -- SXSW
+    ('Texas', NULL, [7, 8], NULL, NULL, NULL, 0.8, 2),                   -- Too hot
+    ('Texas', NULL, [3, 4, 10, 11], NULL, NULL, NULL, 1.15, 3),          -- Best weather
+    ('Midwest', NULL, [6, 7, 8], NULL, NULL, NULL, 1.25, 1),             -- Summer peak
+    ('Midwest', NULL, [12, 1, 2], NULL, NULL, NULL, 0.85, 2),            -- Winter low
+    ('Pacific Northwest', NULL, [7, 8], NULL, NULL, NULL, 1.3, 1),       -- Dry season
+    ('Pacific Northwest', NULL, [11, 12, 1], NULL, NULL, NULL, 0.8, 2),  -- Rainy season
+    ('California', NULL, [9, 10], NULL, NULL, NULL, 1.2, 1),             -- Best weather
+    ('California', NULL, [6, 7, 8], NULL, NULL, NULL, 1.15, 2),          -- Tourism
+    ('Mountain', NULL, [12, 1, 2, 3], NULL, NULL, NULL, 1.3, 1),         -- Ski season
+    ('Mountain', NULL, [6, 7, 8], NULL, NULL, NULL, 1.2, 2)              -- Summer activities
+) AS rules(market, metro_area, months, day_from, day_to, days_of_week, multiplier, priority);
+
+-- Rules resolved to one multiplier per (metro, month, day, day of week); only multipliers other
+-- than 1.0 are kept, so the update below is a single equi-join touching just the affected rows
+CREATE OR REPLACE TEMP TABLE seasonality_lookup AS
+SELECT metro_area, month, day, day_of_week, multiplier
+FROM (
+    SELECT m.metro_area, c.month, c.day, c.day_of_week, r.multiplier,
+           ROW_NUMBER() OVER (PARTITION BY m.metro_area, c.month, c.day, c.day_of_week ORDER BY r.priority) AS rule_rank
+    FROM main.TTH_Seasonality_Markets m
+    JOIN main.TTH_Seasonality_Rules r
+      ON r.market = m.market AND (r.metro_area IS NULL OR r.metro_area = m.metro_area)
+    JOIN (SELECT months.month, days.day, weekdays.day_of_week
+          FROM range(1, 13) months(month), range(1, 32) days(day), range(0, 7) weekdays(day_of_week)) c
+      ON (r.months IS NULL OR list_contains(r.months, c.month))
+     AND c.day BETWEEN COALESCE(r.day_from, 1) AND COALESCE(r.day_to, 31)
+     AND (r.days_of_week IS NULL OR list_contains(r.days_of_week, c.day_of_week))
+)
+WHERE rule_rank = 1 AND multiplier <> 1.0;
+
+-- 2. METRO SEASONALITY
+-- ============================================
 UPDATE main.TTH_F_Reservation t
-SET ADR = ADR * 
-    CASE 
-        -- WARM WEATHER DESTINATIONS - Winter Peak
-        WHEN p."Metro Area" IN ('Miami', 'Miami - Fort Lauderdale', 'Tampa', 
-                              'Tampa - St. Petersburg', 'Orlando', 'Phoenix', 
-                              'Phoenix - Mesa', 'San Diego', 'San Diego - Chula Vista',
-                              'Los Angeles', 'Los Angeles - Long Beach') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (12, 1, 2, 3) THEN 1.35   -- Winter peak
-                WHEN MONTH(t.CheckinDate_DT) IN (6, 7, 8) THEN 0.85       -- Summer low
-                ELSE 1.0
-            END
-            
-        -- LAS VEGAS - Special Events + Weekends
-        WHEN p."Metro Area" = 'Las Vegas' THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) = 1 AND DAY(t.CheckinDate_DT) BETWEEN 5 AND 12 THEN 1.8  -- CES
-                WHEN MONTH(t.CheckinDate_DT) = 12 AND DAY(t.CheckinDate_DT) = 31 THEN 2.2            -- NYE
-                WHEN DAYOFWEEK(t.CheckinDate_DT) IN (6, 7) THEN 1.4                                  -- Weekends
-                ELSE 1.1
-            END
-            
-        -- NORTHEAST CITIES - Fall/Spring Peak
-        WHEN p."Metro Area" IN ('Boston', 'Boston - Cambridge', 'New York', 'New York - Newark',
-                              'Philadelphia', 'Philadelphia - Camden', 'Washington', 
-                              'Washington - Arlington', 'Baltimore', 'Pittsburgh, PA') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (9, 10) THEN 1.3      -- Fall foliage
-                WHEN MONTH(t.CheckinDate_DT) IN (5, 6) THEN 1.25      -- Graduation/tourism
-                WHEN MONTH(t.CheckinDate_DT) IN (1, 2) THEN 0.85      -- Winter low
-                WHEN MONTH(t.CheckinDate_DT) = 12 THEN 1.15           -- Holidays
-                ELSE 1.0
-            END
-            
-        -- TEXAS CITIES - Avoid summer heat
-        WHEN p."Metro Area" IN ('Austin', 'Dallas', 'Dallas - Fort Worth', 
-                              'Houston', 'Houston - The Woodlands', 'San Antonio') THEN
-            CASE 
-                WHEN p."Metro Area" = 'Austin' AND MONTH(t.CheckinDate_DT) = 3 THEN 2.0  -- SXSW
-                WHEN MONTH(t.CheckinDate_DT) IN (7, 8) THEN 0.8                        -- Too hot
-                WHEN MONTH(t.CheckinDate_DT) IN (3, 4, 10, 11) THEN 1.15              -- Best weather
-                ELSE 1.0
-            END
-            
-        -- MIDWEST/COLD CITIES - Summer Peak
-        WHEN p."Metro Area" IN ('Chicago', 'Chicago - Naperville', 'Minneapolis', 
-                              'Minneapolis - St. Paul', 'Detroit', 'Detroit - Warren',
-                              'Cincinnati, OH', 'St. Louis, MO') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (6, 7, 8) THEN 1.25    -- Summer peak
-                WHEN MONTH(t.CheckinDate_DT) IN (12, 1, 2) THEN 0.85   -- Winter low
-                ELSE 1.0
-            END
-            
-        -- PACIFIC NORTHWEST - Summer Peak
-        WHEN p."Metro Area" IN ('Seattle', 'Seattle - Tacoma', 'Portland') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (7, 8) THEN 1.3       -- Dry season
-                WHEN MONTH(t.CheckinDate_DT) IN (11, 12, 1) THEN 0.8  -- Rainy season
-                ELSE 1.0
-            END
-            
-        -- CALIFORNIA CITIES - Steady with slight seasonal
-        WHEN p."Metro Area" IN ('San Francisco', 'San Francisco - Oakland', 'Sacramento') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (9, 10) THEN 1.2    -- Best weather
-                WHEN MONTH(t.CheckinDate_DT) IN (6, 7, 8) THEN 1.15 -- Tourism
-                ELSE 1.0
-            END
-            
-        -- MOUNTAIN CITIES - Winter sports + Summer
-        WHEN p."Metro Area" IN ('Denver', 'Denver - Aurora') THEN
-            CASE 
-                WHEN MONTH(t.CheckinDate_DT) IN (12, 1, 2, 3) THEN 1.3  -- Ski season
-                WHEN MONTH(t.CheckinDate_DT) IN (6, 7, 8) THEN 1.2      -- Summer activities
-                ELSE 1.0
-            END
-            
-        ELSE 1.0  -- Default for any other metros
-    END
-FROM hotel_reservations.main.TTH_D_Property p
-WHERE t.Property_Code = p.Property_Code;
+SET ADR = ADR * s.multiplier
+FROM hotel_reservations.main.TTH_D_Property p, seasonality_lookup s
+WHERE t.Property_Code = p.Property_Code
+  AND s.metro_area = p."Metro Area"
+  AND s.month = MONTH(t.CheckinDate_DT)
+  AND s.day = DAY(t.CheckinDate_DT)
+  AND s.day_of_week = DAYOFWEEK(t.CheckinDate_DT);
 
 -- 3. HOLIDAY SPIKES
 -- ============================================
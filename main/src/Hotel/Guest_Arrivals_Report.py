@@ -1,96 +1,100 @@
-import uuid
+import argparse
 import random
 from datetime import datetime, timedelta
 import os
+import sys
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from id_allocator import IdAllocator
+from scale_factor import scaled
+from table_writer import FILE_FORMATS, TableWriter, csv_ready, write_csv
+
+# Guests at SF1; --num-guests overrides it for a single run
+NUM_GUESTS = scaled(30)
+
+# Keys for every table come from one allocator, so they are unique and rendered in bulk
+id_allocator = IdAllocator()
+
+last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson"]
+first_names = ["John", "Jane", "Michael", "Emily", "David", "Sophia", "Daniel", "Olivia", "Chris", "Ava",
+               "Matthew", "Isabella", "James", "Mia", "Joseph", "Charlotte", "Robert", "Amelia", "Charles", "Harper",
+               "Mary", "Evelyn", "Thomas", "Abigail", "Richard", "Elizabeth", "Paul", "Scarlett", "Mark", "Grace"]
+
+membership_statuses = ["DIAM", "PLAT", "GOLD", "SLVR", "CLUB", "DIAM-NEW", "PLAT-NEW", "GOLD-NEW", "SLVR-NEW", "CLUB-NEW"]
+vip_codes = ["EXE", "1", "2", "3", "100", "8", "SAL", "55", "N/A"]
+booking_channels = ["WEB", "IDC", "APP", "GDS"]
+companies = ["Acme Corp", "Global Corp", "Tech Solutions", "Gov Agency", "Bright Future Co.", "Innovative Labs", "N/A"]
+travel_agents = ["Travel X", "World Tours", "Business Travel Inc.", "Gov Travel", "N/A"]
+languages = ["English", "Spanish", "French", "German", "Chinese", "Japanese"]
+comments_pool = [
+    "VIP guest, prefers quiet room.",
+    "Requires connecting room, family traveling.",
+    "Frequent guest, always requests high floor.",
+    "First-time guest, welcome personally.",
+    "Celebration stay, special amenities requested.",
+    "Previously had issue with AC, check room before arrival.",
+    "Anniversary trip, arrange something special.",
+    "Business traveler, prefers late checkout."
+]
+
+def generate_guest_columns(num_guests=NUM_GUESTS, rng=None):
+    """All guest attributes as NumPy arrays (column name -> array), drawn a column at a time."""
+    rng = rng or np.random.default_rng()
+    n = num_guests
+
+    # Points balance formatted with a thousands separator (1,000 - 500,000 always has exactly one)
+    points = rng.integers(1000, 500001, n)
+    points_balance = np.char.add(np.char.add((points // 1000).astype(str), ","),
+                                 np.char.zfill((points % 1000).astype(str), 3))
+
+    # 20% of guests have a birthday on file (MM-DD, day 1-28 to avoid issues with month lengths)
+    birthday = np.char.add(np.char.add(np.char.zfill(rng.integers(1, 13, n).astype(str), 2), "-"),
+                           np.char.zfill(rng.integers(1, 29, n).astype(str), 2))
+    birthday = np.where(rng.random(n) < 0.2, birthday, "N/A")
+
+    # 30% of guests have hotel comments
+    hotel_comments = np.where(rng.random(n) < 0.3, rng.choice(comments_pool, n), "N/A")
+
+    return {
+        "GuestID": id_allocator.keys("guest", n, "G", 4),
+        "ConfirmationNumber": rng.integers(10000000, 100000000, n).astype(str),
+        "LastName": rng.choice(last_names, n),
+        "FirstName": rng.choice(first_names, n),
+        "IHGOneRewardsNum": rng.integers(1000000000, 10000000000, n).astype(str),
+        "PointsBalance": points_balance,
+        "MembershipStatus": rng.choice(membership_statuses, n),
+        "VIPCode": rng.choice(vip_codes, n),
+        "OptedInIHGEmail": rng.random(n) < 0.5,
+        "HasIHGApp": rng.random(n) < 0.5,
+        "BookingChannel": rng.choice(booking_channels, n),
+        "CompanyName": rng.choice(companies, n),
+        "TravelAgentGroup": rng.choice(travel_agents, n),
+        "PreferredLanguage": rng.choice(languages, n),
+        "IHGCoBrandedCC": rng.random(n) < 0.5,
+        "Birthday": birthday,
+        "SocialInfluencer": rng.random(n) < 0.05, # 5% chance
+        "BigCheese": rng.random(n) < 0.03, # 3% chance
+        "HeadsUp": rng.random(n) < 0.15, # 15% chance
+        "HotelComments": hotel_comments
+    }
 
-def generate_guest_data(num_guests=30):
-    guests_data = []
-    
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
-                  "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
-                  "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson"]
-    first_names = ["John", "Jane", "Michael", "Emily", "David", "Sophia", "Daniel", "Olivia", "Chris", "Ava",
-                   "Matthew", "Isabella", "James", "Mia", "Joseph", "Charlotte", "Robert", "Amelia", "Charles", "Harper",
-                   "Mary", "Evelyn", "Thomas", "Abigail", "Richard", "Elizabeth", "Paul", "Scarlett", "Mark", "Grace"]
-    
-    membership_statuses = ["DIAM", "PLAT", "GOLD", "SLVR", "CLUB", "DIAM-NEW", "PLAT-NEW", "GOLD-NEW", "SLVR-NEW", "CLUB-NEW"]
-    vip_codes = ["EXE", "1", "2", "3", "100", "8", "SAL", "55", "N/A"]
-    booking_channels = ["WEB", "IDC", "APP", "GDS"]
-    companies = ["Acme Corp", "Global Corp", "Tech Solutions", "Gov Agency", "Bright Future Co.", "Innovative Labs", "N/A"]
-    travel_agents = ["Travel X", "World Tours", "Business Travel Inc.", "Gov Travel", "N/A"]
-    languages = ["English", "Spanish", "French", "German", "Chinese", "Japanese"]
-
-    for _ in range(num_guests):
-        guest_id = f"G{str(uuid.uuid4())[:4].upper()}" # Shortened UUID for readability
-        confirmation_number = str(random.randint(10000000, 99999999))
-        last_name = random.choice(last_names)
-        first_name = random.choice(first_names)
-        ihg_rewards_num = str(random.randint(1000000000, 9999999999))
-        points_balance = f"{random.randint(1000, 500000):,}"
-        membership_status = random.choice(membership_statuses)
-        vip_code = random.choice(vip_codes)
-        opted_in_email = random.choice([True, False])
-        has_ihg_app = random.choice([True, False])
-        booking_channel = random.choice(booking_channels)
-        
-        company_name = random.choice(companies)
-        if company_name == "N/A" and random.random() < 0.3: # Make some more N/A for companies
-            company_name = "N/A"
-        
-        travel_agent_group = random.choice(travel_agents)
-        if travel_agent_group == "N/A" and random.random() < 0.3: # Make some more N/A for travel agents
-            travel_agent_group = "N/A"
+def guest_records(guest_columns):
+    """Row view of generate_guest_columns output (one dict per guest) for the per-guest generators."""
+    names = list(guest_columns)
+    return [dict(zip(names, values)) for values in zip(*(guest_columns[name].tolist() for name in names))]
 
-        preferred_language = random.choice(languages)
-        ihg_co_branded_cc = random.choice([True, False])
-        
-        birthday = "N/A"
-        if random.random() < 0.2: # 20% chance of having a birthday
-            month = str(random.randint(1, 12)).zfill(2)
-            day = str(random.randint(1, 28)).zfill(2) # Avoid issues with month lengths
-            birthday = f"{month}-{day}"
-
-        social_influencer = random.random() < 0.05 # 5% chance
-        big_cheese = random.random() < 0.03 # 3% chance
-        heads_up = random.random() < 0.15 # 15% chance
-        
-        hotel_comments = "N/A"
-        if random.random() < 0.3: # 30% chance of comments
-            comments_pool = [
-                "VIP guest, prefers quiet room.",
-                "Requires connecting room, family traveling.",
-                "Frequent guest, always requests high floor.",
-                "First-time guest, welcome personally.",
-                "Celebration stay, special amenities requested.",
-                "Previously had issue with AC, check room before arrival.",
-                "Anniversary trip, arrange something special.",
-                "Business traveler, prefers late checkout."
-            ]
-            hotel_comments = random.choice(comments_pool)
-
-        guests_data.append({
-            "GuestID": guest_id,
-            "ConfirmationNumber": confirmation_number,
-            "LastName": last_name,
-            "FirstName": first_name,
-            "IHGOneRewardsNum": ihg_rewards_num,
-            "PointsBalance": points_balance,
-            "MembershipStatus": membership_status,
-            "VIPCode": vip_code,
-            "OptedInIHGEmail": opted_in_email,
-            "HasIHGApp": has_ihg_app,
-            "BookingChannel": booking_channel,
-            "CompanyName": company_name,
-            "TravelAgentGroup": travel_agent_group,
-            "PreferredLanguage": preferred_language,
-            "IHGCoBrandedCC": ihg_co_branded_cc,
-            "Birthday": birthday,
-            "SocialInfluencer": social_influencer,
-            "BigCheese": big_cheese,
-            "HeadsUp": heads_up,
-            "HotelComments": hotel_comments
-        })
-    return guests_data
+def generate_guest_data(num_guests=NUM_GUESTS):
+    return guest_records(generate_guest_columns(num_guests))
+
+def assign_keys(rows, column, table, prefix):
+    """Fill in rows' key column (created as a None placeholder) with the next keys for table."""
+    for row, key in zip(rows, id_allocator.keys(table, len(rows), prefix, 4).tolist()):
+        row[column] = key
 
 def generate_stays_data(guests_data):
     stays_data = []
@@ -102,11 +106,9 @@ def generate_stays_data(guests_data):
         "High Floor", "Pool View", "Connecting Room", "Accessible Room", "Corner Room"
     ]
 
-    stay_id_counter = 1
     for guest in guests_data:
         num_stays = random.choices([1, 2, 3], weights=[0.7, 0.2, 0.1], k=1)[0] # Most guests have 1 stay
         for _ in range(num_stays):
-            stay_id = f"S{str(stay_id_counter).zfill(4)}"
             guest_id = guest["GuestID"]
             
             check_in_date = (datetime.now() + timedelta(days=random.randint(0, 7))).strftime("%Y-%m-%d")
@@ -130,7 +132,7 @@ def generate_stays_data(guests_data):
             room_attributes = ", ".join(room_attributes) if room_attributes else "N/A"
 
             stays_data.append({
-                "StayID": stay_id,
+                "StayID": None,
                 "GuestID": guest_id,
                 "CheckInDate": check_in_date,
                 "CheckOutDate": check_out_date,
@@ -145,81 +147,101 @@ def generate_stays_data(guests_data):
                 "LongStay": long_stay,
                 "RoomAttributes": room_attributes
             })
-            stay_id_counter += 1
+    assign_keys(stays_data, "StayID", "stay", "S")
     return stays_data
 
-def generate_guest_actions_data(guests_data):
-    actions_data = []
-    
-    action_types_pool = [
-        "Confirmable Upgrade", "Send Upgrade Email", "Provide Lounge Access", "Upgrade Room",
-        "Member Recognition", "Reward Night", "Early Arrival", "IHG Employee", "Ambassador",
-        "Royal Ambassador", "Inner Circle Member", "Welcome Back", "Priority Enrollment",
-        "Target for Enrollment", "Ambassador Enrollment", "Business Rewards Member",
-        "Book Direct", "Close to Next Membership Status", "HeartBeat Issue",
-        "New Royal Ambassador", "New Ambassador Member", "New Inner Circle Member",
-        "New Status Diamond", "New Status Platinum", "New Status Gold", "New Status Silver",
-        "New Member", "Recent IHG Stay", "Long Stay", "Status Match"
-    ]
-
-    action_id_counter = 1
-    for guest in guests_data:
-        guest_id = guest["GuestID"]
-        
-        # Populate all boolean flags
-        for action_type in action_types_pool:
-            if action_type in ["Confirmable Upgrade", "Send Upgrade Email", "Provide Lounge Access", "Upgrade Room", "Reward Night"]:
-                action_status = random.random() < 0.3 # 30% chance for common actions
-            elif action_type in ["HeartBeat Issue", "Close to Next Membership Status"]:
-                action_status = random.random() < 0.15 # 15% chance for issues/near status
-            elif "New Status" in action_type or "New Member" in action_type or "New Royal Ambassador" in action_type or "New Ambassador Member" in action_type or "New Inner Circle Member" in action_type:
-                 action_status = random.random() < 0.05 # 5% chance for new statuses
-            elif "Welcome Back" == action_type and guest["MembershipStatus"] != "CLUB":
-                action_status = True # Likely for non-club members
-            else:
-                action_status = random.random() < 0.5 # Default 50% chance
-
-            email_sent = False
-            if action_type == "Send Upgrade Email" and action_status:
-                email_sent = random.random() < 0.7 # 70% chance it's sent if action is true
-
-            amb_expiration = "N/A"
-            if guest["MembershipStatus"] == "DIAM" or guest["MembershipStatus"] == "PLAT" and random.random() < 0.5:
-                exp_date = (datetime.now() + timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d")
-                amb_expiration = exp_date
-
-            actions_data.append({
-                "ActionID": f"A{str(action_id_counter).zfill(4)}",
-                "GuestID": guest_id,
-                "ActionType": action_type,
-                "ActionStatus": action_status,
-                "EmailSent": email_sent,
-                "AmbassadorExpiration": amb_expiration if action_type == "Ambassador" else "N/A", # Only for Ambassador action type
-                "CloseToNextStatus": action_status if action_type == "Close to Next Membership Status" else False,
-                "NewRoyalAmbassador": action_status if action_type == "New Royal Ambassador" else False,
-                "NewAmbassadorMember": action_status if action_type == "New Ambassador Member" else False,
-                "NewInnerCircleMember": action_status if action_type == "New Inner Circle Member" else False,
-                "NewStatusDiamond": action_status if action_type == "New Status Diamond" else False,
-                "NewStatusPlatinum": action_status if action_type == "New Status Platinum" else False,
-                "NewStatusGold": action_status if action_type == "New Status Gold" else False,
-                "NewStatusSilver": action_status if action_type == "New Status Silver" else False,
-                "NewMember": action_status if action_type == "New Member" else False,
-                "RecentIHGStay": action_status if action_type == "Recent IHG Stay" else False,
-                "IHGEmployee": action_status if action_type == "IHG Employee" else False,
-                "Ambassador": action_status if action_type == "Ambassador" else False,
-                "RoyalAmbassador": action_status if action_type == "Royal Ambassador" else False,
-                "InnerCircleMember": action_status if action_type == "Inner Circle Member" else False,
-                "WelcomeBack": action_status if action_type == "Welcome Back" else False,
-                "PriorityEnrollment": action_status if action_type == "Priority Enrollment" else False,
-                "TargetForEnrollment": action_status if action_type == "Target for Enrollment" else False,
-                "AmbassadorEnrollment": action_status if action_type == "Ambassador Enrollment" else False,
-                "BusinessRewardsMember": action_status if action_type == "Business Rewards Member" else False,
-                "BookDirect": action_status if action_type == "Book Direct" else False,
-                "StatusMatch": action_status if action_type == "Status Match" else False
-            })
-            action_id_counter += 1
+action_types_pool = [
+    "Confirmable Upgrade", "Send Upgrade Email", "Provide Lounge Access", "Upgrade Room",
+    "Member Recognition", "Reward Night", "Early Arrival", "IHG Employee", "Ambassador",
+    "Royal Ambassador", "Inner Circle Member", "Welcome Back", "Priority Enrollment",
+    "Target for Enrollment", "Ambassador Enrollment", "Business Rewards Member",
+    "Book Direct", "Close to Next Membership Status", "HeartBeat Issue",
+    "New Royal Ambassador", "New Ambassador Member", "New Inner Circle Member",
+    "New Status Diamond", "New Status Platinum", "New Status Gold", "New Status Silver",
+    "New Member", "Recent IHG Stay", "Long Stay", "Status Match"
+]
+
+# Chance of each action type being true, precomputed once per type
+def action_probability(action_type):
+    if action_type in ["Confirmable Upgrade", "Send Upgrade Email", "Provide Lounge Access", "Upgrade Room", "Reward Night"]:
+        return 0.3 # 30% chance for common actions
+    if action_type in ["HeartBeat Issue", "Close to Next Membership Status"]:
+        return 0.15 # 15% chance for issues/near status
+    if action_type.startswith("New "):
+        return 0.05 # 5% chance for new statuses
+    return 0.5 # Default 50% chance (Welcome Back is always true for non-club members)
+
+action_probabilities = np.array([action_probability(action_type) for action_type in action_types_pool])
+
+# Flag columns: each is the ActionStatus on the rows of one action type, False elsewhere
+action_flag_columns = {
+    "CloseToNextStatus": "Close to Next Membership Status",
+    "NewRoyalAmbassador": "New Royal Ambassador",
+    "NewAmbassadorMember": "New Ambassador Member",
+    "NewInnerCircleMember": "New Inner Circle Member",
+    "NewStatusDiamond": "New Status Diamond",
+    "NewStatusPlatinum": "New Status Platinum",
+    "NewStatusGold": "New Status Gold",
+    "NewStatusSilver": "New Status Silver",
+    "NewMember": "New Member",
+    "RecentIHGStay": "Recent IHG Stay",
+    "IHGEmployee": "IHG Employee",
+    "Ambassador": "Ambassador",
+    "RoyalAmbassador": "Royal Ambassador",
+    "InnerCircleMember": "Inner Circle Member",
+    "WelcomeBack": "Welcome Back",
+    "PriorityEnrollment": "Priority Enrollment",
+    "TargetForEnrollment": "Target for Enrollment",
+    "AmbassadorEnrollment": "Ambassador Enrollment",
+    "BusinessRewardsMember": "Business Rewards Member",
+    "BookDirect": "Book Direct",
+    "StatusMatch": "Status Match"
+}
+
+def generate_guest_actions_data(guest_columns, rng=None):
+    """One row per guest and action type (guests x action_types_pool), as NumPy columns."""
+    rng = rng or np.random.default_rng()
+    num_guests = len(guest_columns["GuestID"])
+    num_types = len(action_types_pool)
+    n = num_guests * num_types
+
+    # Guest x action type grid, every action type for a guest in turn
+    guest_index = np.repeat(np.arange(num_guests), num_types)
+    type_index = np.tile(np.arange(num_types), num_guests)
+    membership = guest_columns["MembershipStatus"][guest_index]
+
+    def is_type(action_type):
+        return type_index == action_types_pool.index(action_type)
+
+    action_status = rng.random(n) < action_probabilities[type_index]
+    action_status |= is_type("Welcome Back") & (membership != "CLUB")
+
+    email_sent = is_type("Send Upgrade Email") & action_status & (rng.random(n) < 0.7) # 70% chance it's sent if action is true
+
+    # Ambassador rows of DIAM members (and half of PLAT members) get an expiration date 30-365 days out
+    has_expiration = is_type("Ambassador") & ((membership == "DIAM") | ((membership == "PLAT") & (rng.random(n) < 0.5)))
+    expiration = np.full(n, "N/A", dtype="<U10")
+    expiration[has_expiration] = (np.datetime64(datetime.now().date()) +
+                                  rng.integers(30, 366, has_expiration.sum())).astype(str)
+
+    actions_data = {
+        "ActionID": id_allocator.keys("action", n, "A", 4),
+        "GuestID": guest_columns["GuestID"][guest_index],
+        "ActionType": np.array(action_types_pool)[type_index],
+        "ActionStatus": action_status,
+        "EmailSent": email_sent,
+        "AmbassadorExpiration": expiration
+    }
+    for column, action_type in action_flag_columns.items():
+        actions_data[column] = action_status & is_type(action_type)
     return actions_data
 
+def column_blocks(columns, block_size):
+    """Consecutive row slices of a column dict, block_size rows at a time."""
+    num_rows = len(next(iter(columns.values())))
+    for start in range(0, num_rows, block_size):
+        yield {name: values[start:start + block_size] for name, values in columns.items()}
+
 def generate_preferences_requests_data(guests_data):
     preferences_data = []
     
@@ -248,7 +270,6 @@ def generate_preferences_requests_data(guests_data):
         "Other Favorites": ["Extra Pillows", "Slippers", "Bathrobe", "Humidifier"]
     }
 
-    preference_id_counter = 1
     for guest in guests_data:
         guest_id = guest["GuestID"]
         
@@ -259,7 +280,7 @@ def generate_preferences_requests_data(guests_data):
             for req in selected_requests:
                 if req != "N/A":
                     preferences_data.append({
-                        "PreferenceID": f"P{str(preference_id_counter).zfill(4)}",
+                        "PreferenceID": None,
                         "GuestID": guest_id,
                         "RequestType": "Special Request",
                         "RequestDescription": req,
@@ -268,7 +289,6 @@ def generate_preferences_requests_data(guests_data):
                         "KimptonPreferenceType": "N/A",
                         "KimptonPreferenceValue": "N/A"
                     })
-                    preference_id_counter += 1
 
         # Previously Used Amenities
         if random.random() < 0.5: # 50% chance of 1-3 previously used amenities
@@ -277,7 +297,7 @@ def generate_preferences_requests_data(guests_data):
             for amenity in selected_amenities:
                 if amenity != "N/A":
                     preferences_data.append({
-                        "PreferenceID": f"P{str(preference_id_counter).zfill(4)}",
+                        "PreferenceID": None,
                         "GuestID": guest_id,
                         "RequestType": "Previously Used Amenity",
                         "RequestDescription": "N/A",
@@ -286,7 +306,6 @@ def generate_preferences_requests_data(guests_data):
                         "KimptonPreferenceType": "N/A",
                         "KimptonPreferenceValue": "N/A"
                     })
-                    preference_id_counter += 1
 
         # Guest Interests
         if random.random() < 0.7: # 70% chance of 1-3 guest interests
@@ -294,7 +313,7 @@ def generate_preferences_requests_data(guests_data):
             selected_interests = random.sample(guest_interests_pool, k=min(num_interests, len(guest_interests_pool)))
             for interest in selected_interests:
                 preferences_data.append({
-                    "PreferenceID": f"P{str(preference_id_counter).zfill(4)}",
+                    "PreferenceID": None,
                     "GuestID": guest_id,
                     "RequestType": "Guest Interest",
                     "RequestDescription": "N/A",
@@ -303,7 +322,6 @@ def generate_preferences_requests_data(guests_data):
                     "KimptonPreferenceType": "N/A",
                     "KimptonPreferenceValue": "N/A"
                 })
-                preference_id_counter += 1
 
         # Kimpton Preferences (only for DIAM/PLAT members or specific VIP codes)
         if guest["MembershipStatus"] in ["DIAM", "PLAT"] or guest["VIPCode"] in ["EXE", "SAL"]:
@@ -311,7 +329,7 @@ def generate_preferences_requests_data(guests_data):
                 if random.random() < 0.7: # 70% chance to have a Kimpton preference if eligible
                     pref_value = random.choice(kimpton_preference_values[pref_type])
                     preferences_data.append({
-                        "PreferenceID": f"P{str(preference_id_counter).zfill(4)}",
+                        "PreferenceID": None,
                         "GuestID": guest_id,
                         "RequestType": "Kimpton",
                         "RequestDescription": "N/A",
@@ -320,7 +338,7 @@ def generate_preferences_requests_data(guests_data):
                         "KimptonPreferenceType": pref_type,
                         "KimptonPreferenceValue": pref_value
                     })
-                    preference_id_counter += 1
+    assign_keys(preferences_data, "PreferenceID", "preference", "P")
     return preferences_data
 
 def generate_guest_satisfaction_data(guests_data):
@@ -342,9 +360,8 @@ def generate_guest_satisfaction_data(guests_data):
     fb_spend_categories = ["$", "$$", "$$$", "$$$$"]
     fb_ratings = ["1/poor", "2/below average", "3/average range stay", "4/above average", "5/excellent"]
 
-    satisfaction_id_counter = 1
-    for guest in guests_data:
-        satisfaction_id = f"GS{str(satisfaction_id_counter).zfill(4)}"
+    satisfaction_ids = id_allocator.keys("satisfaction", len(guests_data), "GS", 4).tolist()
+    for guest, satisfaction_id in zip(guests_data, satisfaction_ids):
         guest_id = guest["GuestID"]
         
         heartbeat_score = round(random.uniform(5.0, 10.0), 1)
@@ -372,7 +389,6 @@ def generate_guest_satisfaction_data(guests_data):
             "AvgFandBSepend": avg_fb_spend,
             "AvgFandBRating": avg_fb_rating
         })
-        satisfaction_id_counter += 1
     return satisfaction_data
 
 def generate_stay_history_summary_data(guests_data):
@@ -381,9 +397,8 @@ def generate_stay_history_summary_data(guests_data):
     ihg_hotels = ["ATL", "LAX", "NYC", "SFO", "DEN", "ORD", "CHI", "MCO", "SEA", "AUS", "BOS", "MIA", "DAL", "WAS"]
     brands = ["Kimpton", "Holiday Inn", "Crowne Plaza", "Indigo", "InterContinental", "Hotel Indigo", "Staybridge Suites"]
 
-    history_id_counter = 1
-    for guest in guests_data:
-        history_id = f"H{str(history_id_counter).zfill(4)}"
+    history_ids = id_allocator.keys("history", len(guests_data), "H", 4).tolist()
+    for guest, history_id in zip(guests_data, history_ids):
         guest_id = guest["GuestID"]
         
         stays_my_hotel_12m = random.randint(0, 10)
@@ -416,7 +431,6 @@ def generate_stay_history_summary_data(guests_data):
             "BrandMostVisited": brand_most_visited,
             "Reservations2WksOut": reservations_2wks_out
         })
-        history_id_counter += 1
     return history_data
 
 def generate_corporate_rate_amenities_data(guests_data):
@@ -428,7 +442,6 @@ def generate_corporate_rate_amenities_data(guests_data):
         "Gym Access", "Dry Cleaning Discount"
     ]
 
-    corp_amenity_id_counter = 1
     for guest in guests_data:
         if guest["CompanyName"] != "N/A" and random.random() < 0.6: # 60% chance for corporate guests to have amenities
             num_amenities = random.randint(1, 3)
@@ -436,25 +449,34 @@ def generate_corporate_rate_amenities_data(guests_data):
             amenity_description = ", ".join(selected_amenities)
 
             corporate_amenities_data.append({
-                "CorpAmenityID": f"CA{str(corp_amenity_id_counter).zfill(4)}",
+                "CorpAmenityID": None,
                 "GuestID": guest["GuestID"],
                 "CompanyName": guest["CompanyName"],
                 "AmenityDescription": amenity_description
             })
-            corp_amenity_id_counter += 1
+    assign_keys(corporate_amenities_data, "CorpAmenityID", "corp_amenity", "CA")
     return corporate_amenities_data
 
-# Generate all data
-guests_data = generate_guest_data(num_guests=30)
-stays_data = generate_stays_data(guests_data)
-guest_actions_data = generate_guest_actions_data(guests_data)
-preferences_requests_data = generate_preferences_requests_data(guests_data)
-guest_satisfaction_data = generate_guest_satisfaction_data(guests_data)
-stay_history_summary_data = generate_stay_history_summary_data(guests_data)
-corporate_rate_amenities_data = generate_corporate_rate_amenities_data(guests_data)
+def generate_chunk_tables(guest_columns):
+    """Every table for one set of guests, as (table name, data) in write order."""
+    guests_data = guest_records(guest_columns)
+    yield 'guests', guest_columns
+    yield 'stays', generate_stays_data(guests_data)
+    yield 'guest_actions', generate_guest_actions_data(guest_columns)
+    yield 'preferences_requests', generate_preferences_requests_data(guests_data)
+    yield 'guest_satisfaction', generate_guest_satisfaction_data(guests_data)
+    yield 'stay_history_summary', generate_stay_history_summary_data(guests_data)
+    yield 'corporate_rate_amenities', generate_corporate_rate_amenities_data(guests_data)
+
+parser = argparse.ArgumentParser(description='Generate the Guest Arrivals Report tables.')
+parser.add_argument('--stream', choices=FILE_FORMATS,
+                    help='generate guests a chunk at a time and append every table to its own parquet/csv file as it goes')
+parser.add_argument('--chunk-size', type=int, default=100000, help='guests per chunk when streaming')
+parser.add_argument('--num-guests', type=int, default=NUM_GUESTS, help=f'guests to generate (default: {NUM_GUESTS})')
+args = parser.parse_args()
 
 # Define the base directory for saving CSV files
-base_dir = '/Users/jpetrides/Documents/Demo Data/Hotels/main/data/Hotel/GAR'
+base_dir = os.getenv('demo_output_dir', '/Users/jpetrides/Documents/Demo Data/Hotels/main/data/Hotel/GAR')
 
 # Create the directory if it doesn't exist
 os.makedirs(base_dir, exist_ok=True)
@@ -466,19 +488,59 @@ def write_to_csv(data, filename):
         return
 
     filepath = os.path.join(base_dir, filename)
-    keys = data[0].keys() # Get headers from the first dictionary
-
-    with open(filepath, 'w', newline='', encoding='utf-8') as output_file:
-        dict_writer = csv.DictWriter(output_file, keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(data)
+    # Same CSV dialect as the columnar tables and the streamed output
+    write_csv(data, filepath)
     print(f"Successfully wrote {len(data)} rows to {filepath}")
 
-# Write each dataset to a CSV file
-write_to_csv(guests_data, 'guests.csv')
-write_to_csv(stays_data, 'stays.csv')
-write_to_csv(guest_actions_data, 'guest_actions.csv')
-write_to_csv(preferences_requests_data, 'preferences_requests.csv')
-write_to_csv(guest_satisfaction_data, 'guest_satisfaction.csv')
-write_to_csv(stay_history_summary_data, 'stay_history_summary.csv')
-write_to_csv(corporate_rate_amenities_data, 'corporate_rate_amenities.csv')
+# Columnar equivalent of write_to_csv, for data kept as NumPy arrays: one column dict, or an
+# iterable of column dicts written one after another
+def write_columns_to_csv(blocks, filename):
+    if isinstance(blocks, dict):
+        blocks = [blocks]
+    filepath = os.path.join(base_dir, filename)
+    writer = None
+    num_rows = 0
+    for columns in blocks:
+        # Booleans written as True/False, as write_csv does
+        table = csv_ready(pa.table(columns))
+        if writer is None:
+            writer = pacsv.CSVWriter(filepath, table.schema)
+        writer.write_table(table)
+        num_rows += table.num_rows
+    if writer is None:
+        print(f"No data to write for {filename}. Skipping CSV creation.")
+        return
+    writer.close()
+    print(f"Successfully wrote {num_rows} rows to {filepath}")
+
+if args.num_guests <= 0:
+    # Nothing to generate (NumPy's string helpers also fail on empty arrays)
+    print("No guests to generate. Skipping CSV creation.")
+elif args.stream:
+    # Memory stays at one chunk of guests (and their dependent rows) whatever the guest count is;
+    # the writer thread encodes and writes a chunk while the next one is generated
+    with TableWriter(base_dir, args.stream) as writer:
+        for start in range(0, args.num_guests, args.chunk_size):
+            chunk_columns = generate_guest_columns(min(args.chunk_size, args.num_guests - start))
+            for table_name, data in generate_chunk_tables(chunk_columns):
+                writer.write(table_name, data)
+else:
+    # Generate all data
+    guest_columns = generate_guest_columns(args.num_guests)
+    guests_data = guest_records(guest_columns)
+    stays_data = generate_stays_data(guests_data)
+    # 30 action rows per guest, so they are generated (and written) a block of guests at a time
+    guest_actions_data = (generate_guest_actions_data(guest_block) for guest_block in column_blocks(guest_columns, 100000))
+    preferences_requests_data = generate_preferences_requests_data(guests_data)
+    guest_satisfaction_data = generate_guest_satisfaction_data(guests_data)
+    stay_history_summary_data = generate_stay_history_summary_data(guests_data)
+    corporate_rate_amenities_data = generate_corporate_rate_amenities_data(guests_data)
+
+    # Write each dataset to a CSV file
+    write_columns_to_csv(guest_columns, 'guests.csv')
+    write_to_csv(stays_data, 'stays.csv')
+    write_columns_to_csv(guest_actions_data, 'guest_actions.csv')
+    write_to_csv(preferences_requests_data, 'preferences_requests.csv')
+    write_to_csv(guest_satisfaction_data, 'guest_satisfaction.csv')
+    write_to_csv(stay_history_summary_data, 'stay_history_summary.csv')
+    write_to_csv(corporate_rate_amenities_data, 'corporate_rate_amenities.csv')
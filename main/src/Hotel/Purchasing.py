@@ -1,8 +1,23 @@
+import argparse
 import duckdb
 import os
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 from dotenv import load_dotenv
-import random
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled
+
+NUM_ORDERS = scaled(1500)
+
+parser = argparse.ArgumentParser(description='Generate the TTH sourcing (purchasing) tables.')
+parser.add_argument('--append-orders', type=int, metavar='N',
+                    help='append N new orders (and their items) to the existing tables instead of rebuilding them')
+parser.add_argument('--check', action='store_true',
+                    help='compare the summary tables with a full recomputation (a full aggregate, so off by default)')
+args = parser.parse_args()
 
 # Load environment variables
 load_dotenv()
@@ -16,104 +31,127 @@ conn = duckdb.connect(DB_PATH)
 # Use main schema
 conn.execute("USE main")
 
-# Drop existing tables if they exist
-conn.execute("""
-    DROP TABLE IF EXISTS TTH_F_Sourcing_order_items;
-    DROP TABLE IF EXISTS TTH_F_Sourcing_orders;
-    DROP TABLE IF EXISTS TTH_F_Sourcing_pricing;
-    DROP TABLE IF EXISTS TTH_D_Sourcing_products;
-    DROP TABLE IF EXISTS TTH_D_Sourcing_categories;
-    DROP TABLE IF EXISTS TTH_D_Sourcing_vendors;
-    DROP TABLE IF EXISTS TTH_D_Sourcing_brand_tiers;
-""")
-
-# Create dimension tables
-conn.execute("""
-    CREATE TABLE TTH_D_Sourcing_brand_tiers (
-        tier_id INTEGER PRIMARY KEY,
-        tier_name VARCHAR,
-        tier_level INTEGER,
-        description VARCHAR
-    )
-""")
-
-conn.execute("""
-    CREATE TABLE TTH_D_Sourcing_vendors (
-        vendor_id INTEGER PRIMARY KEY,
-        vendor_name VARCHAR,
-        preferred_status BOOLEAN,
-        contract_number VARCHAR,
-        contact_email VARCHAR,
-        contact_phone VARCHAR
-    )
-""")
-
-conn.execute("""
-    CREATE TABLE TTH_D_Sourcing_categories (
-        category_id INTEGER PRIMARY KEY,
-        category_name VARCHAR,
-        parent_category_id INTEGER,
-        sort_order INTEGER
-    )
-""")
-
-conn.execute("""
-    CREATE TABLE TTH_D_Sourcing_products (
-        product_id INTEGER PRIMARY KEY,
-        sku VARCHAR UNIQUE,
-        product_name VARCHAR,
-        category_id INTEGER REFERENCES TTH_D_Sourcing_categories(category_id),
-        vendor_id INTEGER REFERENCES TTH_D_Sourcing_vendors(vendor_id),
-        brand_tier_id INTEGER REFERENCES TTH_D_Sourcing_brand_tiers(tier_id),
-        description TEXT,
-        specifications JSON,
-        min_order_quantity INTEGER,
-        lead_time_days INTEGER,
-        warranty_months INTEGER,
-        compliance_status VARCHAR,
-        unit_of_measure VARCHAR,
-        weight_lbs DECIMAL(10,2),
-        created_date DATE
-    )
-""")
-
-# Create fact tables
-conn.execute("""
-    CREATE TABLE TTH_F_Sourcing_pricing (
-        price_id INTEGER PRIMARY KEY,
-        product_id INTEGER REFERENCES TTH_D_Sourcing_products(product_id),
-        tier_level INTEGER,
-        min_quantity INTEGER,
-        max_quantity INTEGER,
-        unit_price DECIMAL(10,2),
-        effective_date DATE,
-        expiration_date DATE
-    )
-""")
-
-conn.execute("""
-    CREATE TABLE TTH_F_Sourcing_orders (
-        order_id INTEGER PRIMARY KEY,
-        property_id VARCHAR,
-        property_name VARCHAR,
-        order_date DATE,
-        total_amount DECIMAL(10,2),
-        status VARCHAR
-    )
-""")
-
-conn.execute("""
-    CREATE TABLE TTH_F_Sourcing_order_items (
-        order_item_id INTEGER PRIMARY KEY,
-        order_id INTEGER REFERENCES TTH_F_Sourcing_orders(order_id),
-        product_id INTEGER REFERENCES TTH_D_Sourcing_products(product_id),
-        quantity INTEGER,
-        unit_price DECIMAL(10,2),
-        line_total DECIMAL(10,2)
-    )
-""")
-
-# Insert sample data
+# Load a table as one Arrow table with a single INSERT ... SELECT instead of one INSERT per row.
+# data is a list of row tuples in column order, or {column name: array}; values are cast to the
+# table's column types on insert.
+def bulk_insert(table_name, data):
+    if isinstance(data, dict):
+        batch = pa.table(data)
+    else:
+        columns = [name for (name,) in conn.execute(f"SELECT column_name FROM (DESCRIBE {table_name})").fetchall()]
+        batch = pa.table({name: values for name, values in zip(columns, zip(*data))})
+    conn.register('bulk_rows', batch)
+    conn.execute(f"INSERT INTO {table_name} SELECT * FROM bulk_rows")
+    conn.unregister('bulk_rows')
+
+# Drop a table or view, whichever name is (order_summary and monthly_sales used to be views)
+def drop_if_exists(*names):
+    for name in names:
+        kind = conn.execute("SELECT table_type FROM information_schema.tables WHERE table_schema = 'main' "
+                            "AND table_name = ?", [name]).fetchone()
+        if kind:
+            conn.execute(f"DROP {'VIEW' if kind[0] == 'VIEW' else 'TABLE'} {name}")
+
+if not args.append_orders:
+    # Drop existing tables if they exist
+    drop_if_exists('order_summary', 'monthly_sales', 'product_pricing_current')
+    conn.execute("""
+        DROP TABLE IF EXISTS TTH_F_Sourcing_order_items;
+        DROP TABLE IF EXISTS TTH_F_Sourcing_orders;
+        DROP TABLE IF EXISTS TTH_F_Sourcing_pricing;
+        DROP TABLE IF EXISTS TTH_D_Sourcing_products;
+        DROP TABLE IF EXISTS TTH_D_Sourcing_categories;
+        DROP TABLE IF EXISTS TTH_D_Sourcing_vendors;
+        DROP TABLE IF EXISTS TTH_D_Sourcing_brand_tiers;
+    """)
+
+    # Create dimension tables
+    conn.execute("""
+        CREATE TABLE TTH_D_Sourcing_brand_tiers (
+            tier_id INTEGER PRIMARY KEY,
+            tier_name VARCHAR,
+            tier_level INTEGER,
+            description VARCHAR
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE TTH_D_Sourcing_vendors (
+            vendor_id INTEGER PRIMARY KEY,
+            vendor_name VARCHAR,
+            preferred_status BOOLEAN,
+            contract_number VARCHAR,
+            contact_email VARCHAR,
+            contact_phone VARCHAR
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE TTH_D_Sourcing_categories (
+            category_id INTEGER PRIMARY KEY,
+            category_name VARCHAR,
+            parent_category_id INTEGER,
+            sort_order INTEGER
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE TTH_D_Sourcing_products (
+            product_id INTEGER PRIMARY KEY,
+            sku VARCHAR UNIQUE,
+            product_name VARCHAR,
+            category_id INTEGER REFERENCES TTH_D_Sourcing_categories(category_id),
+            vendor_id INTEGER REFERENCES TTH_D_Sourcing_vendors(vendor_id),
+            brand_tier_id INTEGER REFERENCES TTH_D_Sourcing_brand_tiers(tier_id),
+            description TEXT,
+            specifications JSON,
+            min_order_quantity INTEGER,
+            lead_time_days INTEGER,
+            warranty_months INTEGER,
+            compliance_status VARCHAR,
+            unit_of_measure VARCHAR,
+            weight_lbs DECIMAL(10,2),
+            created_date DATE
+        )
+    """)
+
+    # Create fact tables
+    conn.execute("""
+        CREATE TABLE TTH_F_Sourcing_pricing (
+            price_id INTEGER PRIMARY KEY,
+            product_id INTEGER REFERENCES TTH_D_Sourcing_products(product_id),
+            tier_level INTEGER,
+            min_quantity INTEGER,
+            max_quantity INTEGER,
+            unit_price DECIMAL(10,2),
+            effective_date DATE,
+            expiration_date DATE
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE TTH_F_Sourcing_orders (
+            order_id INTEGER PRIMARY KEY,
+            property_id VARCHAR,
+            property_name VARCHAR,
+            order_date DATE,
+            total_amount DECIMAL(10,2),
+            status VARCHAR
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE TTH_F_Sourcing_order_items (
+            order_item_id INTEGER PRIMARY KEY,
+            order_id INTEGER REFERENCES TTH_F_Sourcing_orders(order_id),
+            product_id INTEGER REFERENCES TTH_D_Sourcing_products(product_id),
+            quantity INTEGER,
+            unit_price DECIMAL(10,2),
+            line_total DECIMAL(10,2)
+        )
+    """)
+
+# Sample data
 
 # Brand Tiers
 brand_tiers = [
@@ -124,9 +162,6 @@ brand_tiers = [
     (5, 'Dolce/Registry', 5, 'Upscale brands')
 ]
 
-for tier in brand_tiers:
-    conn.execute("INSERT INTO TTH_D_Sourcing_brand_tiers VALUES (?, ?, ?, ?)", tier)
-
 # Vendors
 vendors = [
     (1, 'Standard Textile Co', True, 'WYN-2024-001', 'sales@standardtextile.com', '800-999-0400'),
@@ -136,9 +171,6 @@ vendors = [
     (5, 'Guest Supply', True, 'WYN-2024-005', 'orders@guestsupply.com', '800-999-0404')
 ]
 
-for vendor in vendors:
-    conn.execute("INSERT INTO TTH_D_Sourcing_vendors VALUES (?, ?, ?, ?, ?, ?)", vendor)
-
 # Categories
 categories = [
     (1, 'Bedding & Linens', None, 1),
@@ -154,9 +186,6 @@ categories = [
     (32, 'Desk & Seating', 3, 2)
 ]
 
-for category in categories:
-    conn.execute("INSERT INTO TTH_D_Sourcing_categories VALUES (?, ?, ?, ?)", category)
-
 # Products
 products = [
     # Bed Linens
@@ -226,11 +255,6 @@ products = [
      1, 7, 24, 'Approved', 'Each', 28.0, '2024-01-15')
 ]
 
-for product in products:
-    conn.execute("""
-        INSERT INTO TTH_D_Sourcing_products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, product)
-
 # Pricing (Volume-based tiers)
 pricing_data = []
 price_id = 1
@@ -268,14 +292,16 @@ for product_id, tiers in product_pricing.items():
         ))
         price_id += 1
 
-for pricing in pricing_data:
-    conn.execute("""
-        INSERT INTO TTH_F_Sourcing_pricing VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, pricing)
+# Tables are loaded parents first (tiers, vendors, categories, products, pricing, then orders and
+# order items) so every foreign key already exists when its rows go in
+if not args.append_orders:
+    bulk_insert('TTH_D_Sourcing_brand_tiers', brand_tiers)
+    bulk_insert('TTH_D_Sourcing_vendors', vendors)
+    bulk_insert('TTH_D_Sourcing_categories', categories)
+    bulk_insert('TTH_D_Sourcing_products', products)
+    bulk_insert('TTH_F_Sourcing_pricing', pricing_data)
 
-# Generate 1000+ Orders
-orders = []
-order_id = 1
+# Orders
 start_date = datetime(2024, 1, 1)
 
 # Property list for random selection
@@ -304,154 +330,240 @@ properties = [
 statuses = ['Delivered', 'Processing', 'Shipped', 'Pending']
 status_weights = [0.6, 0.15, 0.15, 0.1]  # More delivered orders
 
-# Generate 1500 orders over 6 months
-for i in range(1500):
-    property_id, property_name = random.choice(properties)
-    order_date = start_date + timedelta(days=random.randint(0, 180))
-    total_amount = round(random.uniform(500, 25000), 2)
-    status = random.choices(statuses, weights=status_weights)[0]
-    
-    orders.append((
-        order_id,
-        property_id,
-        property_name,
-        order_date.strftime('%Y-%m-%d'),
-        total_amount,
-        status
-    ))
-    order_id += 1
-
-for order in orders:
-    conn.execute("INSERT INTO TTH_F_Sourcing_orders VALUES (?, ?, ?, ?, ?, ?)", order)
-
-# Generate Order Items
-order_items = []
-order_item_id = 1
-
-# Price lookup dictionary based on quantity tiers
-def get_unit_price(product_id, quantity):
-    tiers = product_pricing.get(product_id, [])
-    for min_qty, max_qty, price in tiers:
-        if min_qty <= quantity <= (max_qty or 9999):
-            return price
-    return tiers[-1][2] if tiers else 100.00  # Default to highest tier
-
-# For each order, generate 1-10 line items
-for order_id in range(1, 1501):
-    num_items = random.randint(1, 8)
-    used_products = set()
-    
-    for _ in range(num_items):
-        # Pick a random product not already in this order
-        product_id = random.randint(1, 12)
-        attempts = 0
-        while product_id in used_products and attempts < 10:
-            product_id = random.randint(1, 12)
-            attempts += 1
-        
-        if product_id not in used_products:
-            used_products.add(product_id)
-            
-            # Determine quantity based on product type
-            if product_id in [7, 8]:  # Mattresses
-                quantity = random.choices([5, 10, 20, 30], weights=[0.4, 0.3, 0.2, 0.1])[0]
-            elif product_id in [4, 5]:  # Towels (by dozen)
-                quantity = random.choice([24, 48, 96, 120, 240])
-            elif product_id in [1, 2, 3, 6]:  # Sheets and pillows
-                quantity = random.choice([12, 24, 48, 96, 200])
-            elif product_id in [9, 10]:  # Furniture
-                quantity = random.choices([5, 10, 20, 50], weights=[0.4, 0.3, 0.2, 0.1])[0]
-            else:  # Electronics
-                quantity = random.choices([2, 5, 10, 20], weights=[0.4, 0.3, 0.2, 0.1])[0]
-            
-            # Get appropriate price based on quantity
-            unit_price = get_unit_price(product_id, quantity)
-            line_total = round(quantity * unit_price, 2)
-            
-            order_items.append((
-                order_item_id,
-                order_id,
-                product_id,
-                quantity,
-                unit_price,
-                line_total
-            ))
-            order_item_id += 1
-
-# Insert order items
-print(f"Inserting {len(order_items)} order items...")
-for item in order_items:
-    conn.execute("INSERT INTO TTH_F_Sourcing_order_items VALUES (?, ?, ?, ?, ?, ?)", item)
-
-# Create views for common queries
-conn.execute("""
-    CREATE VIEW product_pricing_current AS
-    SELECT 
-        p.product_id,
-        p.sku,
-        p.product_name,
-        c.category_name,
-        v.vendor_name,
-        pr.min_quantity,
-        pr.max_quantity,
-        pr.unit_price,
-        p.unit_of_measure
-    FROM TTH_D_Sourcing_products p
-    JOIN TTH_D_Sourcing_categories c ON p.category_id = c.category_id
-    JOIN TTH_D_Sourcing_vendors v ON p.vendor_id = v.vendor_id
-    JOIN TTH_F_Sourcing_pricing pr ON p.product_id = pr.product_id
-    WHERE pr.effective_date <= CURRENT_DATE 
-    AND pr.expiration_date >= CURRENT_DATE
-    ORDER BY p.product_id, pr.min_quantity
-""")
-
-conn.execute("""
-    CREATE VIEW order_summary AS
-    SELECT 
-        o.order_id,
-        o.property_name,
-        o.order_date,
-        COUNT(DISTINCT oi.product_id) as item_count,
-        SUM(oi.quantity) as total_units,
-        o.total_amount,
-        o.status
-    FROM TTH_F_Sourcing_orders o
-    JOIN TTH_F_Sourcing_order_items oi ON o.order_id = oi.order_id
-    GROUP BY o.order_id, o.property_name, o.order_date, o.total_amount, o.status
-""")
-
-conn.execute("""
-    CREATE VIEW monthly_sales AS
-    SELECT 
-        DATE_TRUNC('month', o.order_date) as month,
-        COUNT(DISTINCT o.order_id) as order_count,
-        COUNT(DISTINCT o.property_id) as unique_properties,
-        SUM(o.total_amount) as total_sales,
-        AVG(o.total_amount) as avg_order_value
-    FROM TTH_F_Sourcing_orders o
-    WHERE o.status = 'Delivered'
-    GROUP BY DATE_TRUNC('month', o.order_date)
-    ORDER BY month
-""")
-
-# Create indexes for better performance
-conn.execute("CREATE INDEX idx_products_category ON TTH_D_Sourcing_products(category_id)")
-conn.execute("CREATE INDEX idx_products_vendor ON TTH_D_Sourcing_products(vendor_id)")
-conn.execute("CREATE INDEX idx_pricing_product ON TTH_F_Sourcing_pricing(product_id)")
-conn.execute("CREATE INDEX idx_pricing_dates ON TTH_F_Sourcing_pricing(effective_date, expiration_date)")
-conn.execute("CREATE INDEX idx_order_items_order ON TTH_F_Sourcing_order_items(order_id)")
-conn.execute("CREATE INDEX idx_order_items_product ON TTH_F_Sourcing_order_items(product_id)")
-conn.execute("CREATE INDEX idx_orders_date ON TTH_F_Sourcing_orders(order_date)")
-conn.execute("CREATE INDEX idx_orders_property ON TTH_F_Sourcing_orders(property_id)")
+# Order Items
+rng = np.random.default_rng()
+product_ids = np.array(sorted(product_pricing))
+
+# Tier boundaries, flattened across products: product p's tiers start at p * TIER_KEY_SPAN + min_qty,
+# so one searchsorted over the whole array finds the tier of any (product, quantity) pair
+TIER_KEY_SPAN = 10000
+tier_keys = np.array([product_id * TIER_KEY_SPAN + min_qty
+                      for product_id in product_ids for min_qty, _, _ in product_pricing[product_id]])
+tier_products = np.array([product_id for product_id in product_ids for _ in product_pricing[product_id]])
+tier_prices = np.array([price for product_id in product_ids for _, _, price in product_pricing[product_id]])
+# Index of each product's highest tier, by product_id
+last_tier = np.zeros(product_ids.max() + 1, dtype=np.int64)
+last_tier[tier_products] = np.arange(len(tier_products))
+
+# Price lookup based on quantity tiers, for arrays of products and quantities
+def get_unit_prices(order_product_ids, quantities):
+    tier = np.searchsorted(tier_keys, order_product_ids * TIER_KEY_SPAN + quantities, side='right') - 1
+    # Quantities below a product's first tier fall back to its highest tier
+    below_first_tier = (tier < 0) | (tier_products[np.maximum(tier, 0)] != order_product_ids)
+    tier[below_first_tier] = last_tier[order_product_ids[below_first_tier]]
+    return tier_prices[tier]
+
+# Order quantity options (and weights) by product type
+quantity_options = {
+    (7, 8): ([5, 10, 20, 30], [0.4, 0.3, 0.2, 0.1]),            # Mattresses
+    (4, 5): ([24, 48, 96, 120, 240], None),                     # Towels (by dozen)
+    (1, 2, 3, 6): ([12, 24, 48, 96, 200], None),                # Sheets and pillows
+    (9, 10): ([5, 10, 20, 50], [0.4, 0.3, 0.2, 0.1]),           # Furniture
+    (11, 12): ([2, 5, 10, 20], [0.4, 0.3, 0.2, 0.1])            # Electronics
+}
+
+# Line items for orders first_order_id .. first_order_id + num_orders - 1, numbered from first_order_item_id.
+# Each order has 1-8 line items, each a different product: ranking random keys per order draws
+# its products without replacement, and the first num_items of the ranking are kept
+def generate_order_items(first_order_id, num_orders, first_order_item_id):
+    items_per_order = rng.integers(1, 9, num_orders)
+    product_ranking = np.argsort(rng.random((num_orders, len(product_ids))), axis=1)
+    keep = np.arange(len(product_ids)) < items_per_order[:, None]
+    item_order_ids = np.repeat(np.arange(first_order_id, first_order_id + num_orders), items_per_order)
+    item_product_ids = product_ids[product_ranking[keep]]
+    num_order_items = len(item_order_ids)
+
+    # Determine quantity based on product type
+    item_quantities = np.empty(num_order_items, dtype=np.int64)
+    for product_group, (options, weights) in quantity_options.items():
+        in_group = np.isin(item_product_ids, product_group)
+        item_quantities[in_group] = rng.choice(options, in_group.sum(), p=weights)
+
+    # Get appropriate price based on quantity
+    item_unit_prices = get_unit_prices(item_product_ids, item_quantities)
+
+    return {
+        'order_item_id': np.arange(first_order_item_id, first_order_item_id + num_order_items),
+        'order_id': item_order_ids,
+        'product_id': item_product_ids,
+        'quantity': item_quantities,
+        'unit_price': item_unit_prices,
+        'line_total': np.round(item_quantities * item_unit_prices, 2)
+    }
+
+# Orders for the line items generated by generate_order_items, one column at a time. Each order's
+# total_amount is the sum of its line totals: items are grouped by order, so one reduceat over the
+# item array (in cents, to keep the sums exact) totals every order.
+def generate_orders(first_order_id, num_orders, order_items):
+    order_starts = np.searchsorted(order_items['order_id'], np.arange(first_order_id, first_order_id + num_orders))
+    line_total_cents = np.round(order_items['line_total'] * 100).astype(np.int64)
+    total_amount = np.add.reduceat(line_total_cents, order_starts) / 100
+
+    property_index = rng.integers(0, len(properties), num_orders)
+    # Orders over 6 months
+    order_date = np.datetime64(start_date.date()) + rng.integers(0, 181, num_orders)
+
+    return {
+        'order_id': np.arange(first_order_id, first_order_id + num_orders),
+        'property_id': np.array([property_id for property_id, _ in properties])[property_index],
+        'property_name': np.array([property_name for _, property_name in properties])[property_index],
+        'order_date': order_date,
+        'total_amount': total_amount,
+        'status': rng.choice(statuses, num_orders, p=status_weights)
+    }
+
+# Summary tables behind the order_summary and monthly_sales dashboards. Each entry is the full
+# aggregate query restricted to {changed} (TRUE for everything), the summary's key column, that key
+# as an expression over the fact tables, and the keys a batch of appended orders and items touches.
+# Appending re-aggregates only those keys; check_summaries (--check) compares with the full recomputation.
+SUMMARY_TABLES = {
+    'order_summary': ("""
+        SELECT
+            o.order_id,
+            o.property_name,
+            o.order_date,
+            COUNT(DISTINCT oi.product_id) as item_count,
+            SUM(oi.quantity) as total_units,
+            o.total_amount,
+            o.status
+        FROM TTH_F_Sourcing_orders o
+        JOIN TTH_F_Sourcing_order_items oi ON o.order_id = oi.order_id
+        WHERE {changed}
+        GROUP BY o.order_id, o.property_name, o.order_date, o.total_amount, o.status
+    """, 'order_id', 'o.order_id', """
+        SELECT order_id FROM TTH_F_Sourcing_orders WHERE order_id >= {first_order_id}
+        UNION
+        SELECT order_id FROM TTH_F_Sourcing_order_items WHERE order_item_id >= {first_order_item_id}
+    """),
+    'monthly_sales': ("""
+        SELECT
+            DATE_TRUNC('month', o.order_date) as month,
+            COUNT(DISTINCT o.order_id) as order_count,
+            COUNT(DISTINCT o.property_id) as unique_properties,
+            SUM(o.total_amount) as total_sales,
+            AVG(o.total_amount) as avg_order_value
+        FROM TTH_F_Sourcing_orders o
+        WHERE o.status = 'Delivered' AND {changed}
+        GROUP BY DATE_TRUNC('month', o.order_date)
+    """, 'month', "DATE_TRUNC('month', o.order_date)", """
+        SELECT DISTINCT DATE_TRUNC('month', order_date) FROM TTH_F_Sourcing_orders WHERE order_id >= {first_order_id}
+    """)
+}
+
+def create_summary_tables():
+    for table_name, (query, _, _, _) in SUMMARY_TABLES.items():
+        conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM ({query.format(changed='TRUE')}) LIMIT 0")
+
+# Append orders and order items, then re-aggregate the summary rows of just the keys they touch,
+# all in one transaction so the summaries never disagree with the fact tables
+def append_orders(orders, order_items):
+    first_order_id = int(orders['order_id'][0])
+    first_order_item_id = int(order_items['order_item_id'][0])
+    conn.begin()
+    try:
+        bulk_insert('TTH_F_Sourcing_orders', orders)
+        bulk_insert('TTH_F_Sourcing_order_items', order_items)
+        for table_name, (query, key, key_expression, changed_keys) in SUMMARY_TABLES.items():
+            conn.execute(f"CREATE OR REPLACE TEMP TABLE changed_keys AS "
+                         f"{changed_keys.format(first_order_id=first_order_id, first_order_item_id=first_order_item_id)}")
+            conn.execute(f"DELETE FROM {table_name} WHERE {key} IN (SELECT * FROM changed_keys)")
+            conn.execute(f"INSERT INTO {table_name} "
+                         f"{query.format(changed=f'{key_expression} IN (SELECT * FROM changed_keys)')}")
+        conn.execute("DROP TABLE changed_keys")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+# Rows that differ between each summary table and its full recomputation (both directions; floating
+# point columns compared to 6 decimals, since the summation order can differ)
+def check_summaries():
+    mismatches = {}
+    for table_name, (query, _, _, _) in SUMMARY_TABLES.items():
+        comparable = ', '.join(f"ROUND({name}, 6) as {name}" if column_type == 'DOUBLE' else name
+                               for name, column_type in conn.execute(
+                                   f"SELECT column_name, column_type FROM (DESCRIBE {table_name})").fetchall())
+        mismatches[table_name] = conn.execute(f"""
+            WITH maintained AS (SELECT {comparable} FROM {table_name}),
+                 recomputed AS (SELECT {comparable} FROM ({query.format(changed='TRUE')}))
+            SELECT count(*) FROM (
+                (SELECT * FROM maintained EXCEPT ALL SELECT * FROM recomputed)
+                UNION ALL
+                (SELECT * FROM recomputed EXCEPT ALL SELECT * FROM maintained)
+            )
+        """).fetchone()[0]
+    return mismatches
+
+if args.append_orders:
+    num_orders = args.append_orders
+    first_order_id, first_order_item_id = conn.execute("""
+        SELECT (SELECT COALESCE(MAX(order_id), 0) + 1 FROM TTH_F_Sourcing_orders),
+               (SELECT COALESCE(MAX(order_item_id), 0) + 1 FROM TTH_F_Sourcing_order_items)
+    """).fetchone()
+else:
+    num_orders = NUM_ORDERS
+    first_order_id, first_order_item_id = 1, 1
+    create_summary_tables()
+
+# Generate 1500 orders (at SF1), or the number being appended: line items first, then the
+# orders they total up to
+order_items = generate_order_items(first_order_id, num_orders, first_order_item_id)
+orders = generate_orders(first_order_id, num_orders, order_items)
+num_order_items = len(order_items['order_item_id'])
+
+print(f"Inserting {num_orders} orders and {num_order_items} order items...")
+append_orders(orders, order_items)
+
+if not args.append_orders:
+    # Create views for common queries
+    conn.execute("""
+        CREATE VIEW product_pricing_current AS
+        SELECT 
+            p.product_id,
+            p.sku,
+            p.product_name,
+            c.category_name,
+            v.vendor_name,
+            pr.min_quantity,
+            pr.max_quantity,
+            pr.unit_price,
+            p.unit_of_measure
+        FROM TTH_D_Sourcing_products p
+        JOIN TTH_D_Sourcing_categories c ON p.category_id = c.category_id
+        JOIN TTH_D_Sourcing_vendors v ON p.vendor_id = v.vendor_id
+        JOIN TTH_F_Sourcing_pricing pr ON p.product_id = pr.product_id
+        WHERE pr.effective_date <= CURRENT_DATE 
+        AND pr.expiration_date >= CURRENT_DATE
+        ORDER BY p.product_id, pr.min_quantity
+    """)
+
+    # Create indexes for better performance
+    conn.execute("CREATE INDEX idx_products_category ON TTH_D_Sourcing_products(category_id)")
+    conn.execute("CREATE INDEX idx_products_vendor ON TTH_D_Sourcing_products(vendor_id)")
+    conn.execute("CREATE INDEX idx_pricing_product ON TTH_F_Sourcing_pricing(product_id)")
+    conn.execute("CREATE INDEX idx_pricing_dates ON TTH_F_Sourcing_pricing(effective_date, expiration_date)")
+    conn.execute("CREATE INDEX idx_order_items_order ON TTH_F_Sourcing_order_items(order_id)")
+    conn.execute("CREATE INDEX idx_order_items_product ON TTH_F_Sourcing_order_items(product_id)")
+    conn.execute("CREATE INDEX idx_orders_date ON TTH_F_Sourcing_orders(order_date)")
+    conn.execute("CREATE INDEX idx_orders_property ON TTH_F_Sourcing_orders(property_id)")
+
+# Consistency check (--check): the maintained summary tables against a full recomputation, which
+# costs more than the incremental maintenance it verifies
+mismatches = check_summaries() if args.check else {}
+for table_name, mismatched_rows in mismatches.items():
+    print(f"{table_name}: {'consistent' if not mismatched_rows else f'{mismatched_rows} rows differ from a full recomputation'}")
 
 # Commit and close
 conn.commit()
 conn.close()
 
-print(f"Database created successfully at: {DB_PATH}")
+if any(mismatches.values()):
+    sys.exit(1)
+
+print(f"Database {'updated' if args.append_orders else 'created'} successfully at: {DB_PATH}")
 print(f"\nGenerated:")
-print(f"- {len(orders)} orders")
-print(f"- {len(order_items)} order line items")
+print(f"- {num_orders} orders")
+print(f"- {num_order_items} order line items")
 print("\nTable structure:")
 print("Dimension Tables:")
 print("- TTH_D_Sourcing_brand_tiers")
@@ -462,13 +574,14 @@ print("\nFact Tables:")
 print("- TTH_F_Sourcing_pricing")
 print("- TTH_F_Sourcing_orders")
 print("- TTH_F_Sourcing_order_items")
-print("\nViews created:")
-print("- product_pricing_current")
+print("\nSummary tables (kept up to date by --append-orders):")
 print("- order_summary")
 print("- monthly_sales")
+print("\nViews created:")
+print("- product_pricing_current")
 print("\nSample queries you can run:")
 print("- SELECT * FROM product_pricing_current WHERE product_name LIKE '%Sheet%';")
 print("- SELECT * FROM order_summary ORDER BY total_amount DESC LIMIT 10;")
-print("- SELECT * FROM monthly_sales;")
+print("- SELECT * FROM monthly_sales ORDER BY month;")
 print("- SELECT property_name, COUNT(*) as order_count, SUM(total_amount) as total_spent")
-print("  FROM TTH_F_Sourcing_orders GROUP BY property_name ORDER BY total_spent DESC;")
\ No newline at end of file
+print("  FROM TTH_F_Sourcing_orders GROUP BY property_name ORDER BY total_spent DESC;")
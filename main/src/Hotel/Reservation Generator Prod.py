@@ -1,174 +1,257 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import pyarrow as pa
+from datetime import date, timedelta
+from multiprocessing import Pool
+import os
+import sys
 import duckdb
 
-# Set random seed for reproducibility
-np.random.seed(42)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from columnar_sink import ColumnarSink
+from scale_factor import NUM_HOTELS, NUM_CUSTOMERS
+
+# Global seed; every hotel gets its own random stream derived from (SEED, HotelID, window start),
+# so a hotel can be regenerated on its own and the output does not depend on NUM_WORKERS
+SEED = 42
+
+# 'full' rebuilds Reservations3 and the revenue tables; 'incremental' rolls the existing
+# TOTAL_DAYS window forward to today (the weekly refresh)
+MODE = os.getenv('reservation_mode', 'full')
 
 # Constants
-NUM_HOTELS = 100
+START_DATE = date(2023, 1, 1)
 ROOMS_PER_HOTEL = 100
 DAYS_IN_YEAR = 365
-TOTAL_DAYS = 2 * DAYS_IN_YEAR  # 2 years of data
+TOTAL_DAYS = 2 * DAYS_IN_YEAR  # 2 years of data, and the width of the rolling window
 OCCUPANCY_MIN = 0.70
 OCCUPANCY_MAX = 0.90
-ADR = np.linspace(500, 100, NUM_HOTELS)  # Generate ADR values for 100 hotels
+ADR = np.linspace(500, 100, NUM_HOTELS)  # Generate ADR values for each hotel
 BOOKING_CHANNELS = ['OTA', 'Direct', 'Group']
 BOOKING_CHANNEL_PROB = [0.45, 0.45, 0.10]  # Adjusted probabilities
 AVG_LENGTH_OF_STAY = 3
 MAX_LENGTH_OF_STAY = 20
-AVG_LEAD_TIME = 7
-MAX_LEAD_TIME = 200
-NUM_CUSTOMERS = 150000
-
-# Generate data
-records = []
-reservation_id = 1
-
-for hotel_id in range(1, NUM_HOTELS + 1):
-    adr = ADR[hotel_id - 1]
-    num_rooms = ROOMS_PER_HOTEL
-    occupancy_rate = np.random.uniform(OCCUPANCY_MIN, OCCUPANCY_MAX)
-    total_room_nights = int(num_rooms * TOTAL_DAYS * occupancy_rate)
-    
+MIN_LEAD_TIME = 1  # reservations are made between yesterday and 150 days before check-in
+MAX_LEAD_TIME = 150
+
+# Hotels are generated in shards of SHARD_SIZE spread across NUM_WORKERS processes
+NUM_WORKERS = os.cpu_count()
+SHARD_SIZE = 25
+
+# Candidates are drawn in blocks sized from the room nights still needed;
+# the overbooking check rejects some, so overdraw a little
+BLOCK_OVERDRAW = 1.1
+MIN_BLOCK_SIZE = 64
+
+RESERVATION_SCHEMA = pa.schema([
+    ('ReservationID', pa.int32()),
+    ('HotelID', pa.int32()),
+    ('CustomerID', pa.int32()),
+    ('BookingChannel', pa.string()),
+    ('CheckinDate', pa.timestamp('us')),
+    ('CheckoutDate', pa.timestamp('us')),
+    ('ReservationDate', pa.timestamp('us')),
+    ('ADR', pa.float64()),
+    ('LengthOfStay', pa.int32()),
+    ('Brand', pa.string()),
+    ('adult_count', pa.int32()),
+    ('child_count', pa.int32()),
+    ('total_guests', pa.int32()),
+    ('RM_Revenue', pa.float64())
+])
+
+# Brand per ADR: ADR up to each ceiling maps to the brand at the same position, above the last is LUX
+BRAND_ADR_CEILINGS = [120, 170, 250, 450]
+BRANDS = ['Palonia Select', 'Palonia Hotel', 'Palonia Hotel', 'Palonia LUX', 'Palonia LUX']
+
+# Derived columns, applied in order to each hotel's batch as it is generated (a rule can read the
+# columns set by the rules above it). The base ADR sets the Brand before the +/-10% jitter so the
+# hotels within a brand don't all have the same ADR, and RM_Revenue uses the jittered ADR.
+ENRICHMENT_RULES = [
+    ("Brand", lambda c, rng: np.asarray(BRANDS)[np.searchsorted(BRAND_ADR_CEILINGS, c['ADR'])]),
+    ("adult_count", lambda c, rng: np.rint(rng.random(len(c['ADR'])) * 3 + 1).astype(np.int32)),
+    ("child_count", lambda c, rng: np.full(len(c['ADR']), 4, dtype=np.int32)),
+    ("total_guests", lambda c, rng: c['adult_count'] + c['child_count']),
+    ("ADR", lambda c, rng: c['ADR'] * (1 + rng.uniform(-0.1, 0.1, len(c['ADR'])))),
+    ("RM_Revenue", lambda c, rng: np.round(c['ADR'] * c['LengthOfStay'], 2)),
+    ("ReservationDate", lambda c, rng: c['CheckinDate'] - rng.integers(MIN_LEAD_TIME, MAX_LEAD_TIME + 1,
+                                                                       len(c['ADR'])).astype('timedelta64[D]')),
+]
+
+def draw_candidates(rng, n, num_days):
+    """Draw n candidate reservations over num_days check-in days as whole arrays (one call per attribute)."""
+    customer_id = rng.integers(1, NUM_CUSTOMERS + 1, n)
+    channel_idx = rng.choice(len(BOOKING_CHANNELS), n, p=BOOKING_CHANNEL_PROB)
+    checkin_day = rng.integers(0, num_days, n)
+    length_of_stay = np.clip(rng.poisson(AVG_LENGTH_OF_STAY, n), 1, MAX_LENGTH_OF_STAY)
+    return customer_id, channel_idx, checkin_day, length_of_stay
+
+def enrich(columns, rng):
+    """Apply ENRICHMENT_RULES to a columnar batch in one pass."""
+    for name, rule in ENRICHMENT_RULES:
+        columns[name] = rule(columns, rng)
+    return columns
+
+class OccupancyTracker:
+    """Rooms sold per hotel per day (a hotel x day matrix), updated in batches.
+
+    Candidate stays are admitted a block at a time: each stay is exploded into its nights and ranked
+    against the other candidates wanting the same night, and a stay is admitted only if its rank fits
+    in the rooms left on every one of its nights. That is conservative, so the matrix never goes over
+    capacity and no post-hoc overbooking cleanup is needed; rejected stays are simply redrawn.
+    """
+
+    def __init__(self, hotel_ids, num_days, capacity, occupancy=None):
+        self.hotel_index = {hotel_id: i for i, hotel_id in enumerate(hotel_ids)}
+        self.num_days = num_days
+        self.capacity = capacity
+        if occupancy is None:
+            occupancy = np.zeros((len(self.hotel_index), num_days), dtype=np.int32)
+        self.occupancy = occupancy
+
+    def admissible(self, hotel_id, start_day, end_day):
+        """Boolean mask of the stays [start_day, end_day) that can be booked together without overbooking."""
+        row = self.occupancy[self.hotel_index[hotel_id]]
+        nights = end_day - start_day
+        stay = np.repeat(np.arange(len(start_day)), nights)
+        night_offset = np.arange(len(stay)) - np.repeat(np.cumsum(nights) - nights, nights)
+        day = start_day[stay] + night_offset
+
+        # Rank each stay among the candidates for the same night, earlier draws first
+        order = np.lexsort((stay, day))
+        day_sorted = day[order]
+        rank = np.empty(len(stay), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.searchsorted(day_sorted, day_sorted, side='left')
+
+        admitted = np.ones(len(start_day), dtype=bool)
+        admitted[stay[rank >= self.capacity - row[day]]] = False
+        return admitted
+
+    def book(self, hotel_id, start_day, end_day):
+        """Add the stays [start_day, end_day) to the hotel's row through a difference array."""
+        delta = (np.bincount(start_day, minlength=self.num_days + 1)
+                 - np.bincount(end_day, minlength=self.num_days + 1))
+        self.occupancy[self.hotel_index[hotel_id]] += np.cumsum(delta[:-1]).astype(np.int32)
+
+def hotel_rng(hotel_id, start_date, seed=SEED):
+    """Independent random stream for one hotel's window, derived from (seed, hotel_id, start_date)."""
+    return np.random.default_rng([seed, hotel_id, start_date.toordinal()])
+
+def hotel_occupancy_rate(hotel_id, seed=SEED):
+    """Target occupancy for a hotel; fixed per hotel so incremental windows match the full build."""
+    return np.random.default_rng([seed, hotel_id]).uniform(OCCUPANCY_MIN, OCCUPANCY_MAX)
+
+def generate_hotel_reservations(hotel_id, tracker, start_date=START_DATE, seed=SEED):
+    """Generate one hotel's check-ins for the tracker's days from start_date as columnar arrays.
+
+    Rooms already in the tracker (stays carried in from before start_date) count toward the
+    occupancy target. ReservationID is assigned by the caller.
+    """
+    rng = hotel_rng(hotel_id, start_date, seed)
+    occupancy_rate = hotel_occupancy_rate(hotel_id, seed)
+    total_room_nights = (int(tracker.capacity * tracker.num_days * occupancy_rate)
+                         - int(tracker.occupancy[tracker.hotel_index[hotel_id]].sum()))
+
     room_nights_count = 0
-    daily_occupancy = np.zeros(TOTAL_DAYS)  # Track daily occupancy to prevent overbooking
-    
+    blocks = []
+
     while room_nights_count < total_room_nights:
-        customer_id = np.random.randint(1, NUM_CUSTOMERS + 1)
-        booking_channel = np.random.choice(BOOKING_CHANNELS, p=BOOKING_CHANNEL_PROB)
-        
-        checkin_date = datetime(2023, 1, 1) + timedelta(days=np.random.randint(0, TOTAL_DAYS))
-        length_of_stay = np.random.poisson(AVG_LENGTH_OF_STAY)
-        if length_of_stay < 1:
-            length_of_stay = 1
-        if length_of_stay > MAX_LENGTH_OF_STAY:
-            length_of_stay = MAX_LENGTH_OF_STAY
-        
-        checkout_date = checkin_date + timedelta(days=length_of_stay)
-        
-        # Ensure no overbooking
-        checkin_day = (checkin_date - datetime(2023, 1, 1)).days
-        checkout_day = (checkout_date - datetime(2023, 1, 1)).days
-        if checkout_day > TOTAL_DAYS:
-            checkout_day = TOTAL_DAYS
-        
-        if np.all(daily_occupancy[checkin_day:checkout_day] < num_rooms):
-            daily_occupancy[checkin_day:checkout_day] += 1
-            room_nights_count += length_of_stay
-            
-            lead_time = int(np.random.exponential(AVG_LEAD_TIME))
-            lead_time = min(lead_time, MAX_LEAD_TIME)
-            reservation_date = checkin_date - timedelta(days=lead_time)
-            
-            records.append({
-                'ReservationID': reservation_id,
-                'HotelID': hotel_id,
-                'CustomerID': customer_id,
-                'BookingChannel': booking_channel,
-                'CheckinDate': checkin_date,
-                'CheckoutDate': checkout_date,
-                'ReservationDate': reservation_date,
-                'ADR': adr,
-                'LengthOfStay': length_of_stay
-            })
-            reservation_id += 1
-
-# Create DataFrame
-df = pd.DataFrame(records)
-
-# Connect to DuckDB
-db_path = '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/hotel_reservations.duckdb'
-con = duckdb.connect(db_path)
-
-# Create table if not exists
-con.execute('''
-CREATE TABLE IF NOT EXISTS Reservations3 (
-    ReservationID INTEGER,
-    HotelID INTEGER,
-    CustomerID INTEGER,
-    BookingChannel VARCHAR,
-    CheckinDate TIMESTAMP,
-    CheckoutDate TIMESTAMP,
-    ReservationDate TIMESTAMP,
-    ADR DOUBLE,
-    LengthOfStay INTEGER
-)
-''')
-
-# Insert data into the table
-con.execute('''
-INSERT INTO Reservations3
-SELECT * FROM df
-''')
-
-# SQL to clear out excess occupancy
-excess_occupancy_sql = '''
-WITH occupancy_cte AS (
-    SELECT cast(c.date as date) as Hotel_Date,
-           r.HotelID,
-           r.ReservationID,
-           COUNT(*) OVER (PARTITION BY cast(c.date as date), r.HotelID) as daily_bookings,
-           ROW_NUMBER() OVER (PARTITION BY cast(c.date as date), r.HotelID 
-                              ORDER BY r.ReservationID DESC) as row_num
-    FROM hotel_reservations.main.calendar_reference c 
-    INNER JOIN hotel_reservations.main.Reservations3 r
-    ON c.date BETWEEN r.CheckinDate AND r.CheckoutDate
-),
-reservations_to_delete AS (
-    SELECT DISTINCT ReservationID
-    FROM occupancy_cte
-    WHERE daily_bookings > 100 AND row_num > 100
-)
-DELETE FROM hotel_reservations.main.Reservations3
-WHERE ReservationID IN (SELECT ReservationID FROM reservations_to_delete);
-'''
+        n = max(int((total_room_nights - room_nights_count) / AVG_LENGTH_OF_STAY * BLOCK_OVERDRAW), MIN_BLOCK_SIZE)
+        customer_id, channel_idx, checkin_day, length_of_stay = draw_candidates(rng, n, tracker.num_days)
+        checkout_day = np.minimum(checkin_day + length_of_stay, tracker.num_days)
+
+        # Ensure no overbooking, then keep admitted stays in draw order until the target is met
+        admitted = np.flatnonzero(tracker.admissible(hotel_id, checkin_day, checkout_day))
+        nights_before = np.cumsum(length_of_stay[admitted]) - length_of_stay[admitted]
+        accepted = admitted[nights_before < total_room_nights - room_nights_count]
+        tracker.book(hotel_id, checkin_day[accepted], checkout_day[accepted])
+        room_nights_count += int(length_of_stay[accepted].sum())
+
+        blocks.append((customer_id[accepted], channel_idx[accepted], checkin_day[accepted], length_of_stay[accepted]))
 
-# Execute the SQL to clear out excess occupancy
-con.execute(excess_occupancy_sql)
-
-#Set brand per ADR
-con.execute('''
-alter table hotel_reservations.main.Reservations3 add Brand varchar(50);
-UPDATE hotel_reservations.main.Reservations3 set Brand =  
-case 
-when ADR <=120 then 'Palonia Select'
-when ADR <=170 then 'Palonia Hotel'
-when ADR <=250 then 'Palonia Hotel'
-when ADR <=450 then Palonia LUX'
-ELSE 'Palonia LUX'
-end;
-''')
-
-#Add child and Adult Counts
-con.execute('''
-alter table hotel_reservations.main.Reservations3 add adult_count integer;
-alter table hotel_reservations.main.Reservations3 add child_count integer;
-alter table hotel_reservations.main.Reservations3 add total_guests integer;
-UPDATE hotel_reservations.main.Reservations3 SET adult_count = (RANDOM() * 3 + 1)::INTEGER;
-update hotel_reservations.main.Reservations3 set child_count = (RANDOM() * 0 + 4)::INTEGER;
-update hotel_reservations.main.Reservations3 set total_guests = adult_count + child_count;
-''')
-
-#mix up the ADR a little bit so the hotels within a brand down't all have the same ADR
-#RANDOM() generates a random number between 0 and 1.
-#Multiplying it by 0.2 gives a random number between 0 and 0.2.
-#Subtracting 0.1 shifts this to a range between -0.1 and 0.1.
-#Adding 1 gives us a multiplier between 0.9 and 1.1.
-#Multiplying the original ADR by this factor will increase or decrease it by up to 10%.
-con.execute('''
-UPDATE hotel_reservations.main.Reservations3 SET ADR = ADR * (1 + (RANDOM() * 0.2 - 0.1));''')
-
-#add row level Rooms revenue to each reservation record
-con.execute ('''alter table hotel_reservations.main.Reservations3 add RM_Revenue decimal (10,2);
-update hotel_reservations.main.Reservations3 SET RM_Revenue = ADR * LengthOfStay ;''')
-
-#fix reservation date that is throwing off the Total bookings metric
-#reservations should be between yesterday and 150 days ago
-con.execute(
-'''UPDATE hotel_reservations.main.Reservations3
-SET ReservationDate = CheckinDate - INTERVAL (1 + RANDOM() % 150) DAY;''')
+    if not blocks:
+        # Rooms carried in already meet the occupancy target: no new check-ins for this hotel
+        blocks.append(tuple(np.empty(0, dtype=np.int64) for _ in range(4)))
+    customer_id, channel_idx, checkin_day, length_of_stay = (np.concatenate(c) for c in zip(*blocks))
+    checkin_date = np.datetime64(start_date, 'D') + checkin_day
+    return enrich({
+        'HotelID': np.full(len(checkin_day), hotel_id, dtype=np.int32),
+        'CustomerID': customer_id.astype(np.int32),
+        'BookingChannel': np.asarray(BOOKING_CHANNELS)[channel_idx],
+        'CheckinDate': checkin_date.astype('datetime64[us]'),
+        'CheckoutDate': (checkin_date + length_of_stay).astype('datetime64[us]'),
+        'ADR': np.full(len(checkin_day), ADR[hotel_id - 1]),
+        'LengthOfStay': length_of_stay.astype(np.int32),
+    }, rng)
+
+def generate_shard(hotel_ids, start_date, num_days, occupancy, seed=SEED):
+    """Generate a shard of hotels in one worker, returning the per-hotel columnar batches in hotel order."""
+    tracker = OccupancyTracker(hotel_ids, num_days, ROOMS_PER_HOTEL, occupancy)
+    return [generate_hotel_reservations(hotel_id, tracker, start_date, seed) for hotel_id in hotel_ids]
+
+def generate_reservations(hotel_ids, start_date=START_DATE, num_days=TOTAL_DAYS, occupancy=None,
+                          first_id=1, num_workers=NUM_WORKERS, seed=SEED):
+    """Run the batch engine over hotel_ids and return a ColumnarSink with sequential ReservationIDs.
+
+    occupancy optionally pre-loads rooms already sold (hotel_ids x num_days). Shards are collected
+    in hotel order and ReservationIDs are numbered from first_id in that order afterwards, so IDs
+    never collide across shards and the result is identical for any worker count.
+    """
+    hotel_ids = list(hotel_ids)
+    if occupancy is None:
+        occupancy = np.zeros((len(hotel_ids), num_days), dtype=np.int32)
+    shards = [(hotel_ids[i:i + SHARD_SIZE], start_date, num_days, occupancy[i:i + SHARD_SIZE], seed)
+              for i in range(0, len(hotel_ids), SHARD_SIZE)]
+    if num_workers > 1 and len(shards) > 1:
+        with Pool(min(num_workers, len(shards))) as pool:
+            shard_batches = pool.starmap(generate_shard, shards)
+    else:
+        shard_batches = [generate_shard(*shard) for shard in shards]
+
+    # Each hotel's arrays go into the sink as one record batch
+    sink = ColumnarSink(RESERVATION_SCHEMA)
+    for shard in shard_batches:
+        while shard:
+            batch = shard.pop(0)
+            batch['ReservationID'] = np.arange(first_id + sink.num_rows,
+                                               first_id + sink.num_rows + len(batch['HotelID']), dtype=np.int32)
+            sink.append(batch)
+    return sink
+
+db_path = os.path.join(os.getenv('demo_output_dir', '/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea'), 'hotel_reservations.duckdb')
+
+def create_reservations_table(con):
+    """Create an empty Reservations3 if the database has none yet."""
+    con.execute('''
+    CREATE TABLE IF NOT EXISTS Reservations3 (
+        ReservationID INTEGER,
+        HotelID INTEGER,
+        CustomerID INTEGER,
+        BookingChannel VARCHAR,
+        CheckinDate TIMESTAMP,
+        CheckoutDate TIMESTAMP,
+        ReservationDate TIMESTAMP,
+        ADR DOUBLE,
+        LengthOfStay INTEGER,
+        Brand VARCHAR(50),
+        adult_count INTEGER,
+        child_count INTEGER,
+        total_guests INTEGER,
+        RM_Revenue DECIMAL(10,2)
+    )
+    ''')
+
+def load_reservations(con, sink):
+    """Create Reservations3 if needed and bulk insert the generated reservations from the sink's Arrow batches."""
+    create_reservations_table(con)
+
+    # Insert data into the table
+    sink.register(con, 'new_reservations')
+    con.execute('''
+    INSERT INTO Reservations3
+    SELECT * FROM new_reservations
+    ''')
+    con.unregister('new_reservations')
 
 #Create hotel Revenue Daily Table
 #This helps us calculate daily occupancy, ADR, and RevPAR
@@ -177,37 +260,150 @@ SET ReservationDate = CheckinDate - INTERVAL (1 + RANDOM() % 150) DAY;''')
 #The second table is revenue and roomnights per reservation per day
 #we're also bringing in the reservation and customer ID so we don't 
 #need to join to the large reservations table.
-con.execute ('''
--- what is my daily occupancy, ADR, and RevPAR?
-Create Table hotel_reservations.main.Hotel_Revenue_Daily as (
-select cast(c.date as date) as Hotel_Date
-,r.HotelID 
-,sum(r.ADR) as revenue
+
+#Both tables come from one expansion of each reservation into its stay nights
+#(CheckinDate + 0 .. LengthOfStay - 1) instead of a range join against calendar_reference,
+#so the summary is a plain hash group-by and the detail is a projection (one row per night)
+STAY_NIGHTS_SQL = '''
+SELECT CAST(CheckinDate AS DATE) + CAST(night AS INTEGER) AS Hotel_Date
+,HotelID
+,ReservationID
+,CustomerID
+,ADR
+,total_guests
+FROM (
+    SELECT *, unnest(range(LengthOfStay)) AS night
+    FROM hotel_reservations.main.Reservations3
+    {where}
+)
+'''
+
+# what is my daily occupancy, ADR, and RevPAR?
+REVENUE_DAILY_SQL = f'''
+select Hotel_Date
+,HotelID 
+,sum(ADR) as revenue
 ,count(*) as "Rm_Nights"
 ,sum(total_guests) as total_guests
-,100 as Available_Rooms
-from hotel_reservations.main.calendar_reference c 
-inner join  hotel_reservations.main.Reservations3 r
-on c.date between  r.CheckinDate and r.CheckoutDate 
+,{ROOMS_PER_HOTEL} as Available_Rooms
+from stay_nights
 group by 1,2
-);
+'''
 
-             
+# Where are my ADR and Room nights coming from?
+REVENUE_DAILY_DTL_SQL = '''
+select Hotel_Date
+,HotelID 
+,ReservationID
+,CustomerID
+,ADR as revenue
+,1::BIGINT as "Rm_Nights"
+from stay_nights
+'''
 
--- Where are my ADR and Room nights coming from?
-Create Table hotel_reservations.main.Hotel_Revenue_Daily_DTL as (
-select cast(c.date as date) as Hotel_Date
-,r.HotelID 
-,r.ReservationID
-,r.CustomerID
-,sum(r.ADR) as revenue
-,count(*) as "Rm_Nights"
-from hotel_reservations.main.calendar_reference c 
-inner join  hotel_reservations.main.Reservations3 r
-on c.date between  r.CheckinDate and r.CheckoutDate 
-group by 1,2,3,4
-);
-''') 
-
-# Close the connection to duckdb
-con.close()
\ No newline at end of file
+def build_revenue_daily(con):
+    """Build Hotel_Revenue_Daily and Hotel_Revenue_Daily_DTL from Reservations3."""
+    con.execute(f"CREATE OR REPLACE TEMP TABLE stay_nights AS {STAY_NIGHTS_SQL.format(where='')}")
+    con.execute(f'''
+    Create or Replace Table hotel_reservations.main.Hotel_Revenue_Daily as ({REVENUE_DAILY_SQL});
+    Create or Replace Table hotel_reservations.main.Hotel_Revenue_Daily_DTL as ({REVENUE_DAILY_DTL_SQL});
+    DROP TABLE stay_nights;
+    ''')
+
+def refresh_reservations(con, hotel_ids, as_of=None):
+    """Roll the TOTAL_DAYS window forward to as_of (default today) instead of rebuilding.
+
+    Only check-in days past the high-water mark of Reservations3 are generated and appended,
+    check-ins that fall out of the window are retired, and Hotel_Revenue_Daily/_DTL are rebuilt
+    just for the (hotel, date) partitions touched by either. This is the only maintainer of those
+    tables. With no Reservations3 rows to roll forward from, the window ending at as_of is built in
+    full instead.
+    """
+    as_of = as_of or date.today()
+    # A fresh database has no Reservations3 yet; an empty one takes the full-window build below
+    create_reservations_table(con)
+    high_water_mark, max_reservation_id = con.execute('''
+    SELECT CAST(max(CheckinDate) AS DATE), max(ReservationID) FROM hotel_reservations.main.Reservations3
+    ''').fetchone()
+    if high_water_mark is None:
+        window_start = as_of - timedelta(days=TOTAL_DAYS - 1)
+        print(f"Reservations3 is empty; building the window {window_start} to {as_of} in full")
+        load_reservations(con, generate_reservations(hotel_ids, window_start, TOTAL_DAYS))
+        build_revenue_daily(con)
+        return
+    num_days = (as_of - high_water_mark).days
+    if num_days <= 0:
+        print(f"Reservations3 is already current through {high_water_mark}")
+        return
+    start_date = high_water_mark + timedelta(days=1)
+    window_start = as_of - timedelta(days=TOTAL_DAYS - 1)
+
+    # Rooms on the new days already sold to stays that checked in on or before the high-water mark
+    hotel_ids = list(hotel_ids)
+    hotel_index = {hotel_id: i for i, hotel_id in enumerate(hotel_ids)}
+    booked = con.execute(f'''
+    SELECT HotelID, datediff('day', DATE '{start_date}', Hotel_Date) AS day, Rm_Nights
+    FROM hotel_reservations.main.Hotel_Revenue_Daily
+    WHERE Hotel_Date BETWEEN DATE '{start_date}' AND DATE '{as_of}'
+    ''').df()
+    booked = booked[booked['HotelID'].isin(hotel_index)]
+    occupancy = np.zeros((len(hotel_ids), num_days), dtype=np.int32)
+    np.add.at(occupancy, (booked['HotelID'].map(hotel_index).to_numpy(), booked['day'].to_numpy()),
+              booked['Rm_Nights'].to_numpy().astype(np.int32))
+
+    reservations = generate_reservations(hotel_ids, start_date, num_days, occupancy,
+                                         first_id=max_reservation_id + 1)
+
+    con.begin()
+    try:
+        load_reservations(con, reservations)
+
+        # (hotel, date) partitions touched by the new stays or by the stays leaving the window
+        con.execute(f'''
+        CREATE OR REPLACE TEMP TABLE affected_partitions AS
+        SELECT DISTINCT HotelID, Hotel_Date
+        FROM ({STAY_NIGHTS_SQL.format(where=f"WHERE ReservationID > {max_reservation_id} OR CheckinDate < DATE '{window_start}'")})
+        WHERE Hotel_Date >= DATE '{window_start}'
+        ''')
+        con.execute(f"DELETE FROM hotel_reservations.main.Reservations3 WHERE CheckinDate < DATE '{window_start}'")
+        for table in ('Hotel_Revenue_Daily', 'Hotel_Revenue_Daily_DTL'):
+            con.execute(f'''
+            DELETE FROM hotel_reservations.main.{table} WHERE Hotel_Date < DATE '{window_start}';
+            DELETE FROM hotel_reservations.main.{table} t USING affected_partitions a
+            WHERE t.HotelID = a.HotelID AND t.Hotel_Date = a.Hotel_Date;
+            ''')
+
+        # Re-expand only the stays that can reach an affected partition
+        con.execute(f'''
+        CREATE OR REPLACE TEMP TABLE stay_nights AS
+        SELECT n.*
+        FROM ({STAY_NIGHTS_SQL.format(where=f"WHERE CheckoutDate > (SELECT min(Hotel_Date) FROM affected_partitions)")}) n
+        SEMI JOIN affected_partitions a ON n.HotelID = a.HotelID AND n.Hotel_Date = a.Hotel_Date
+        ''')
+        con.execute(f'''
+        INSERT INTO hotel_reservations.main.Hotel_Revenue_Daily {REVENUE_DAILY_SQL};
+        INSERT INTO hotel_reservations.main.Hotel_Revenue_Daily_DTL {REVENUE_DAILY_DTL_SQL};
+        DROP TABLE stay_nights;
+        DROP TABLE affected_partitions;
+        ''')
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    print(f"Appended {reservations.num_rows} reservations checking in {start_date} to {as_of}; window starts {window_start}")
+
+if __name__ == "__main__":
+    # Connect to DuckDB
+    con = duckdb.connect(db_path)
+
+    if MODE == 'incremental':
+        refresh_reservations(con, range(1, NUM_HOTELS + 1))
+    else:
+        # Generate data
+        reservations = generate_reservations(range(1, NUM_HOTELS + 1))
+        load_reservations(con, reservations)
+        build_revenue_daily(con)
+
+    # Close the connection to duckdb
+    con.close()
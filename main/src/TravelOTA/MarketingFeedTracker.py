@@ -3,25 +3,34 @@ import numpy as np
 import random
 from datetime import datetime, timedelta
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from scale_factor import scaled
 
 # Configuration
-num_feeds = 5
+num_feeds = scaled(5)
 start_date = datetime(2024, 1, 1)
 end_date = datetime(2024, 7, 1)
 records_per_day = 24
-output_dir = '/Users/jpetrides/Documents/Demo Data/OTA'  # Specify your directory
+output_dir = os.getenv('demo_output_dir', '/Users/jpetrides/Documents/Demo Data/OTA')  # Specify your directory
 
 # Create the directory if it doesn't exist
 os.makedirs(output_dir, exist_ok=True)
 
 # Feed Names
-feed_names = [
+base_feed_names = [
     "CustomerDataFeed",
     "ProductCatalogUpdates",
     "SalesTransactions",
     "InventorySync",
     "MarketingCampaignResults"
 ]
+# num_feeds feeds cycling through the base names; copies past the first are numbered (CustomerDataFeed2, ...)
+feed_names = []
+for i in range(num_feeds):
+    copy, base = divmod(i, len(base_feed_names))
+    feed_names.append(base_feed_names[base] + (str(copy + 1) if copy else ""))
 
 # Function to generate random error messages
 def generate_error_message():
@@ -1,15 +1,56 @@
-import pandas as pd
 import numpy as np
+import pyarrow as pa
 from faker import Faker
 import random
 from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from columnar_sink import ColumnarSink
+from scale_factor import scaled
+from table_writer import write_csv
 
 # Set random seed for reproducibility
 np.random.seed(42)
 fake = Faker()
 
-def generate_d_account(num_accounts=100):
-    data = []
+D_ACCOUNT_SCHEMA = pa.schema([
+    ('Account_Name', pa.string()), ('Account_ID', pa.string()), ('Geo_ID', pa.string()),
+    ('Prioritization_Score', pa.float64()), ('Open_CTAs', pa.int64()), ('Open_Cases', pa.int64()),
+    ('Open_Claims', pa.int64()), ('Activities', pa.int64()), ('Leads', pa.int64()),
+    ('Bookings_L365', pa.int64()), ('GBV_L365', pa.int64()), ('Nights_L365', pa.int64()),
+    ('Avg_Review_Score_L365', pa.float64()), ('Forward_Occupancy_12W', pa.float64()),
+    ('Forward_Availability_12W', pa.float64()), ('Forward_Availability_52W', pa.float64()),
+    ('Host_Retention_Score', pa.int64()), ('Total_Open_Items', pa.int64())
+])
+
+D_LISTING_SCHEMA = pa.schema([
+    ('Listing_Name', pa.string()), ('Listing_ID', pa.string()), ('Account_ID', pa.string()),
+    ('Guest_Favorite', pa.bool_()), ('Geo_ID', pa.string()), ('Host_Quality_System_Status', pa.string()),
+    ('Avg_Overall_Rating_Lifetime', pa.float64()), ('Avg_Overall_Rating_L365', pa.float64()),
+    ('Bookings_L365', pa.int64()), ('GBV_L365', pa.int64()), ('Nights_L365', pa.int64()),
+    ('Share_Available_Nights_12W', pa.float64()), ('Forward_Nights_Available_12W', pa.int64()),
+    ('Forward_Nights_Available_52W', pa.int64())
+])
+
+D_HOTEL_SCHEMA = pa.schema([
+    ('Hotel_Name', pa.string()), ('Listing_ID', pa.string()), ('Account_ID', pa.string()),
+    ('Geo_ID', pa.string()), ('Bookings_MTD', pa.int64()), ('Bookings_QTD', pa.int64()),
+    ('Bookings_YTD', pa.int64()), ('GBV_MTD', pa.int64()), ('GBV_QTD', pa.int64()),
+    ('GBV_YTD', pa.int64()), ('Room_Nights_MTD', pa.int64()), ('Room_Nights_QTD', pa.int64()),
+    ('Room_Nights_YTD', pa.int64()), ('Avg_LOS', pa.float64()), ('Booking_Window_Same_Day', pa.float64()),
+    ('Booking_Window_1_7_Days', pa.float64()), ('Booking_Window_8_Plus_Days', pa.float64())
+])
+
+D_RESERVATION_SCHEMA = pa.schema([
+    ('Reservation_ID', pa.string()), ('Hotel_ID', pa.string()), ('Check_in_Date', pa.date32()),
+    ('Check_out_Date', pa.date32()), ('Length_of_Stay', pa.int64()), ('Reservation_Date', pa.date32()),
+    ('Rate_Code', pa.string())
+])
+
+def generate_d_account(num_accounts=scaled(100)):
+    data = ColumnarSink(D_ACCOUNT_SCHEMA)
     
     for i in range(1, num_accounts + 1):
         account_id = f"ACCT_{i:02d}"
@@ -35,18 +76,19 @@ def generate_d_account(num_accounts=100):
             'Host_Retention_Score': random.randint(50, 100),
             'Total_Open_Items': random.randint(1, 200)
         }
-        data.append(row)
+        data.append_row(row)
     
-    df = pd.DataFrame(data)
-    df.to_csv("/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Account.csv", index=False)
-    return df
+    table = data.to_table()
+    write_csv(table, "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Account.csv")
+    return table
 
-def generate_d_listing(d_account_df, num_listings=500):
-    data = []
+def generate_d_listing(d_account, num_listings=scaled(500)):
+    data = ColumnarSink(D_LISTING_SCHEMA)
     statuses = ['Active', 'Inactive', 'Pending', 'Suspended']
+    account_ids = d_account['Account_ID'].to_pylist()
     
     for i in range(1, num_listings + 1):
-        account_id = random.choice(d_account_df['Account_ID'].values)
+        account_id = random.choice(account_ids)
         
         row = {
             'Listing_Name': fake.company(),
@@ -64,18 +106,19 @@ def generate_d_listing(d_account_df, num_listings=500):
             'Forward_Nights_Available_12W': random.randint(30, 84),
             'Forward_Nights_Available_52W': random.randint(100, 365)
         }
-        data.append(row)
+        data.append_row(row)
     
-    df = pd.DataFrame(data)
-    df.to_csv("/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Listing.csv", index=False)
-    return df
+    table = data.to_table()
+    write_csv(table, "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Listing.csv")
+    return table
 
-def generate_d_hotel(d_account_df, num_hotels=50):
-    data = []
+def generate_d_hotel(d_account, num_hotels=scaled(50)):
+    data = ColumnarSink(D_HOTEL_SCHEMA)
+    account_ids = d_account['Account_ID'].to_pylist()
     
     for i in range(1, num_hotels + 1):
         hotel_id = f"HOTEL_{i:02d}"
-        account_id = random.choice(d_account_df['Account_ID'].values)
+        account_id = random.choice(account_ids)
         
         # Generate booking window mix that sums to 100%
         same_day = random.uniform(0.1, 0.3)
@@ -101,18 +144,18 @@ def generate_d_hotel(d_account_df, num_hotels=50):
             'Booking_Window_1_7_Days': one_to_seven,
             'Booking_Window_8_Plus_Days': eight_plus
         }
-        data.append(row)
+        data.append_row(row)
     
-    df = pd.DataFrame(data)
-    df.to_csv("/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Hotel.csv", index=False)
-    return df
+    table = data.to_table()
+    write_csv(table, "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Hotel.csv")
+    return table
 
-def generate_d_reservation(d_hotel_df):
-    data = []
+def generate_d_reservation(d_hotel):
+    data = ColumnarSink(D_RESERVATION_SCHEMA)
     start_date = datetime.now() - timedelta(days=25*30)  # 25 months ago
     
-    for hotel_id in d_hotel_df['Listing_ID'].values:
-        # Generate between 500-1000 reservations per hotel
+    for hotel_id in d_hotel['Listing_ID'].to_pylist():
+        # Generate between 500-1000 reservations per hotel (so reservations scale with num_hotels)
         num_reservations = random.randint(500, 1000)
         
         for _ in range(num_reservations):
@@ -130,14 +173,14 @@ def generate_d_reservation(d_hotel_df):
                 'Reservation_Date': reservation_date.date(),
                 'Rate_Code': f"R_{random.randint(1, 100):02d}"
             }
-            data.append(row)
+            data.append_row(row)
     
-    df = pd.DataFrame(data)
-    df.to_csv("/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Reservation.csv", index=False)
-    return df
+    table = data.to_table()
+    write_csv(table, "/Users/jpetrides/Documents/Demo Data/Hotels/Jeeves Idea/data/Vacation_Rental/D_Reservation.csv")
+    return table
 
 # Generate all tables
-d_account_df = generate_d_account()
-d_listing_df = generate_d_listing(d_account_df)
-d_hotel_df = generate_d_hotel(d_account_df)
-d_reservation_df = generate_d_reservation(d_hotel_df)
\ No newline at end of file
+d_account = generate_d_account()
+d_listing = generate_d_listing(d_account)
+d_hotel = generate_d_hotel(d_account)
+d_reservation = generate_d_reservation(d_hotel)
\ No newline at end of file
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import duckdb
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from materialized_view import MV_SLOTS_SESSIONS
+
+SESSIONS_PER_DAY = 48
+NUM_DAYS = 5
+
+# Every SESSIONS_PER_DAY sessions make a day, loaded with LoadID day + 1: one starts every 30 minutes
+# and runs 30 minutes to 2.5 hours with 10 transactions, so the day's last sessions run past midnight
+# and the next day's first ones can end before the latest of those transactions
+DAY_OF_TRANSACTIONS = f'''
+SELECT
+    s.SessionID,
+    s.SessionID % 7 AS MachineID,
+    'Customer_' || (s.SessionID % 11) AS CustomerID,
+    TIMESTAMP '2024-01-01' + to_minutes(CAST(s.SessionID * 30 + t.n * (s.SessionID * 7 % 5 + 1) * 3 AS INTEGER)) AS Timestamp,
+    CAST((s.SessionID + t.n) % 5 AS DOUBLE) AS BetAmount,
+    CAST((s.SessionID * t.n) % 4 AS DOUBLE) AS PayoutAmount,
+    ? + 1 AS LoadID
+FROM range(? * {SESSIONS_PER_DAY}, (? + 1) * {SESSIONS_PER_DAY}) s(SessionID), range(10) t(n)
+'''
+
+
+def test_sessions_loaded_a_day_at_a_time_stay_consistent():
+    con = duckdb.connect()
+    con.execute(f"CREATE TABLE F_Slots_Transactions AS {DAY_OF_TRANSACTIONS}", [0, 0, 0])
+    MV_SLOTS_SESSIONS.refresh(con)
+
+    for day in range(1, NUM_DAYS):
+        con.execute(f"INSERT INTO F_Slots_Transactions {DAY_OF_TRANSACTIONS}", [day, day, day])
+        rows, keys, _ = MV_SLOTS_SESSIONS.refresh(con)
+
+        assert keys is not None  # refreshed incrementally, not rebuilt
+        assert MV_SLOTS_SESSIONS.check(con) == 0
+    assert con.execute("SELECT count(*) FROM MV_Slots_Sessions").fetchone()[0] == NUM_DAYS * SESSIONS_PER_DAY
+
+
+def test_late_row_with_an_old_timestamp_is_recomputed():
+    con = duckdb.connect()
+    con.execute(f"CREATE TABLE F_Slots_Transactions AS {DAY_OF_TRANSACTIONS}", [0, 0, 0])
+    con.execute(f"INSERT INTO F_Slots_Transactions {DAY_OF_TRANSACTIONS}", [1, 1, 1])
+    MV_SLOTS_SESSIONS.refresh(con)
+
+    # A transaction of the first session, timestamped before every other row, arrives in load 3
+    con.execute("""
+    INSERT INTO F_Slots_Transactions
+    SELECT SessionID, MachineID, CustomerID, TIMESTAMP '2023-12-31', 100.0, 0.0, 3
+    FROM F_Slots_Transactions WHERE SessionID = 0 LIMIT 1
+    """)
+    rows, keys, load_id = MV_SLOTS_SESSIONS.refresh(con)
+
+    assert (rows, keys, load_id) == (1, 1, 3)
+    assert MV_SLOTS_SESSIONS.check(con) == 0
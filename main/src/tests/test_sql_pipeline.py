@@ -0,0 +1,33 @@
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(SRC_DIR, 'Common'))
+from sql_pipeline import split_statements
+
+
+def test_reservation_update_step_names():
+    with open(os.path.join(SRC_DIR, 'Hotel', 'F_Reservation_Updates.sql')) as f:
+        headings = [heading for heading, _ in split_statements(f.read())]
+
+    assert headings == [
+        '1. SEASONALITY RULES',
+        '1. SEASONALITY RULES',
+        'Rules resolved to one multiplier per (metro, month, day, day of week); only multipliers other',
+        '2. METRO SEASONALITY',
+        '3. HOLIDAY SPIKES',
+        '4. BOOKING LEAD TIME ADJUSTMENTS',
+        '5. LENGTH OF STAY DISCOUNTS',
+        '6. CHANNEL-BASED PRICING',
+        '7. ADD RANDOM VARIATION (for realism)',
+        '8. SPECIAL COMPRESSION NIGHTS (high occupancy = higher rates)',
+        '9. APPLY CAPS AND FLOORS',
+        '10. ROUND TO REALISTIC VALUES',
+        'Update RM_Revenue to match new ADR',
+    ]
+
+
+def test_trailing_comment_belongs_to_previous_statement():
+    script = "-- first\nSELECT 1; -- about the first\nSELECT 2;\n-- 2. SECOND\nSELECT 3;\n"
+
+    assert [heading for heading, _ in split_statements(script)] == ['first', None, '2. SECOND']